@@ -83,8 +83,8 @@ def demo_xml_syntax_checker():
         if result['has_errors']:
             print("❌ 发现语法错误:")
             for error in result['errors']:
-                print(f"   • 第 {error['line']} 行，第 {error['column']} 列: {error['message']}")
-                print(f"     错误类型: {error['type']}")
+                print(f"   • 第 {error.line} 行，第 {error.column} 列: {error.message}")
+                print(f"     错误类型: {error.type}")
         else:
             print("✅ XML 语法正确，包括注释处理")
         
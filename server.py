@@ -7,7 +7,7 @@ import logging
 from mcp.server.fastmcp import FastMCP
 
 # 导入工具模块
-from tools import read_text_file, replace_code_by_line, create_file, search_in_file
+import tools
 
 # Configure logging for comprehensive error tracking
 logging.basicConfig(level=logging.INFO)
@@ -16,11 +16,9 @@ logger = logging.getLogger("mcp-server")
 # Create FastMCP server instance
 mcp = FastMCP("code-operate-mcp-server")
 
-# 注册工具
-mcp.tool()(read_text_file)
-mcp.tool()(replace_code_by_line)
-mcp.tool()(create_file)
-mcp.tool()(search_in_file)
+# 注册工具（按 tools.__all__ 动态加载各工具模块）
+for tool_name in tools.__all__:
+    mcp.tool()(getattr(tools, tool_name))
 
 if __name__ == "__main__":
     logger.info("[Setup] Initializing Code Operation MCP Server...")
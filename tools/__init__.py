@@ -1,11 +1,31 @@
 """
 MCP Server Tools Module
 包含所有工具的模块
+
+工具函数在首次访问时才导入对应的子模块（PEP 562 模块级 __getattr__）
 """
 
-from .read_text_file import read_text_file
-from .replace_code_by_line import replace_code_by_line
-from .create_file import create_file
-from .search_in_file import search_in_file
+import importlib
 
 __all__ = ["read_text_file", "replace_code_by_line", "create_file", "search_in_file"]
+
+
+def __getattr__(name):
+    """
+    按需导入工具函数，工具名与子模块名一致
+    
+    Args:
+        name: 工具名称
+    
+    Returns:
+        对应的工具函数
+    
+    Raises:
+        AttributeError: 名称不是已注册的工具时抛出
+    """
+    if name in __all__:
+        module = importlib.import_module(f".{name}", __name__)
+        tool = getattr(module, name)
+        globals()[name] = tool
+        return tool
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
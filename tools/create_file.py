@@ -4,7 +4,9 @@
 """
 
 import os
+import stat
 from typing import Annotated
+from utils.atomic_writer import write_file_atomic
 from utils.syntax_checker import SyntaxChecker
 
 
@@ -40,6 +42,12 @@ def create_file(
         if not isinstance(content, str):
             return "错误：文件内容必须是字符串"
         
+        # 先编码内容，编码失败时不会创建目录或触碰目标文件
+        try:
+            encoded_content = content.encode('utf-8')
+        except UnicodeEncodeError:
+            return f"错误：文件内容包含无法编码的字符 - {file_path}"
+        
         # 获取文件所在目录
         directory = os.path.dirname(file_path)
         
@@ -59,33 +67,49 @@ def create_file(
             if not os.access(directory, os.W_OK):
                 return f"错误：没有权限在目录中创建文件 - {directory}"
         
-        # 检查文件是否已存在
-        file_already_exists = os.path.exists(file_path)
+        # 检查文件是否已存在（一次 stat 调用同时获取存在性与文件类型）
+        try:
+            existing_stat = os.stat(file_path)
+        except FileNotFoundError:
+            existing_stat = None
+        except OSError as e:
+            return f"错误：无法获取文件信息 - {str(e)}"
+        
+        file_already_exists = existing_stat is not None
         if file_already_exists:
             # 检查是否为文件（而不是目录）
-            if not os.path.isfile(file_path):
+            if not stat.S_ISREG(existing_stat.st_mode):
                 return f"错误：指定路径已存在且不是文件 - {file_path}"
             
             # 检查文件权限
             if not os.access(file_path, os.W_OK):
                 return f"错误：没有权限覆盖现有文件 - {file_path}"
         
+        # 检查是否需要进行语法检查
+        file_extension = os.path.splitext(file_path)[1].lower()
+        
+        # 定义文件扩展名到语法检查器的映射
+        syntax_map = {
+            '.lua': 'lua',
+            '.xml': 'xml',
+            '.txt': 'xml'  # .txt 文件使用 XML 语法检查器
+        }
+        
+        # 语法检查只依赖内存中的内容，在后台线程中与文件写入同时进行
+        syntax_future = None
+        if file_extension in syntax_map and content.strip():
+            syntax_future = SyntaxChecker.check_syntax_async(encoded_content, syntax_map[file_extension])
+        
         # 创建文件并写入内容
         try:
-            with open(file_path, 'w', encoding='utf-8') as file:
-                file.write(content)
+            write_file_atomic(file_path, encoded_content)
         except PermissionError:
             return f"错误：没有权限创建文件 - {file_path}"
         except OSError as e:
             return f"错误：创建文件失败 - {str(e)}"
-        except UnicodeEncodeError:
-            return f"错误：文件内容包含无法编码的字符 - {file_path}"
         
-        # 获取文件信息
-        try:
-            file_size = os.path.getsize(file_path)
-        except OSError:
-            file_size = 0
+        # 获取文件信息（写入的字节数即文件大小，无需再次获取文件状态）
+        file_size = len(encoded_content)
         
         # 构建基本结果信息
         result_info = []
@@ -101,37 +125,27 @@ def create_file(
         if directories_created:
             result_info.append(f"📁 创建目录: {', '.join(directories_created)}")
         
-        # 检查是否需要进行语法检查
-        file_extension = os.path.splitext(file_path)[1].lower()
-        
-        # 定义文件扩展名到语法检查器的映射
-        syntax_map = {
-            '.lua': 'lua',
-            '.xml': 'xml',
-            '.txt': 'xml'  # .txt 文件使用 XML 语法检查器
-        }
-        
-        if file_extension in syntax_map and content.strip():
+        if syntax_future is not None:
             language = syntax_map[file_extension]
             result_info.append("")
             result_info.append(f"🔍 {language.upper()} 语法检查结果:")
             
             try:
-                syntax_result = SyntaxChecker.check_syntax(content, language)
+                syntax_result = syntax_future.result()
                 
                 if syntax_result["is_valid"]:
                     result_info.append("✅ 语法检查通过，代码有效")
                 else:
                     result_info.append("❌ 发现语法错误:")
                     for error in syntax_result["errors"]:
-                        if error["line"] > 0:
-                            result_info.append(f"- 第{error['line']}行，第{error['column']}列: {error['message']}")
+                        if error.line > 0:
+                            result_info.append(f"- 第{error.line}行，第{error.column}列: {error.message}")
                         else:
-                            result_info.append(f"- {error['message']}")
+                            result_info.append(f"- {error.message}")
                             
             except Exception as e:
                 result_info.append(f"⚠️ 语法检查失败: {str(e)}")
-        elif file_extension in syntax_map and not content.strip():
+        elif file_extension in syntax_map:
             language = syntax_map[file_extension]
             result_info.append("")
             result_info.append(f"ℹ️ 空的 {language.upper()} 文件，跳过语法检查")
@@ -3,9 +3,93 @@
 用于读取指定完整路径的文件，以UTF-8编码返回带行号的纯文本内容
 """
 
-import os
-from typing import Annotated
-from mcp.server.fastmcp import FastMCP
+import mmap
+from typing import Annotated, List, Tuple, Union
+from utils.file_cache import LONE_CR_PATTERN, MAX_CACHED_FILE_SIZE, load_file, translate_newlines
+from utils.file_stat import stat_regular_file
+from utils.line_counter import count_lines
+
+
+def _read_line_window(buffer: Union[bytes, mmap.mmap], start_line: int, count: int) -> List[str]:
+    """
+    在文件的字节内容中定位指定范围的行，仅对选中的字节区间进行 UTF-8 解码
+    
+    Args:
+        buffer: 文件的字节内容或内存映射
+        start_line: 开始读取的行号（从1开始）
+        count: 要读取的行数
+    
+    Returns:
+        选中的行列表（不含换行符）
+    """
+    size = len(buffer)
+    
+    # 跳过开始行之前的所有行
+    start = 0
+    for _ in range(start_line - 1):
+        newline = buffer.find(b'\n', start)
+        if newline == -1:
+            start = size
+            break
+        start = newline + 1
+    
+    # 继续查找 count 个换行符以确定结束位置
+    end = start
+    for _ in range(count):
+        if end >= size:
+            break
+        newline = buffer.find(b'\n', end)
+        end = size if newline == -1 else newline + 1
+    
+    selected = buffer[start:end].decode('utf-8')
+    if not selected:
+        return []
+    
+    lines = selected.split('\n')
+    if selected.endswith('\n'):
+        lines.pop()
+    
+    # 只有存在 '\r' 时才需要逐行去除 Windows 换行符残留
+    if '\r' in selected:
+        lines = [line.rstrip('\r') for line in lines]
+    return lines
+
+
+def _split_line_window(text: str, start_line: int, count: int) -> Tuple[List[str], int]:
+    """
+    在已统一换行符的文本中选取指定范围的行（文件包含单独的 '\\r' 换行符时使用，行号与 search_in_file 一致）
+    
+    Args:
+        text: 换行符已统一为 '\\n' 的文本
+        start_line: 开始读取的行号（从1开始）
+        count: 要读取的行数
+    
+    Returns:
+        (选中的行列表（不含换行符）, 文件总行数)
+    """
+    lines = text.split('\n')
+    if lines[-1] == '':
+        lines.pop()
+    return lines[start_line - 1:start_line - 1 + count], len(lines)
+
+
+def _read_large_file_window(file_path: str, start_line: int, count: int) -> Tuple[List[str], int]:
+    """
+    通过内存映射读取大文件的指定范围的行（大文件不进入文件缓存）
+    
+    Args:
+        file_path: 文件的完整路径
+        start_line: 开始读取的行号（从1开始）
+        count: 要读取的行数
+    
+    Returns:
+        (选中的行列表（不含换行符）, 文件总行数)
+    """
+    with open(file_path, 'rb') as file:
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            if LONE_CR_PATTERN.search(buffer):
+                return _split_line_window(translate_newlines(buffer[:].decode('utf-8')), start_line, count)
+            return _read_line_window(buffer, start_line, count), count_lines(buffer)
 
 
 def read_text_file(
@@ -28,17 +112,10 @@ def read_text_file(
         各种文件操作相关的异常
     """
     try:
-        # 验证文件路径
-        if not file_path:
-            return "错误：文件路径不能为空"
-        
-        # 检查文件是否存在
-        if not os.path.exists(file_path):
-            return f"错误：文件不存在 - {file_path}"
-        
-        # 检查是否为文件（而不是目录）
-        if not os.path.isfile(file_path):
-            return f"错误：指定路径不是文件 - {file_path}"
+        # 验证文件路径，检查文件是否存在且为普通文件（一次 stat 调用完成）
+        file_stat, error = stat_regular_file(file_path)
+        if error:
+            return error
         
         # 验证行号参数
         if start_line < 1:
@@ -50,44 +127,46 @@ def read_text_file(
         if count > 100:
             return "错误：读取行数不能超过100"
         
-        # 读取文件
+        # 读取文件（仅解码指定范围的行；较小的文件通过文件缓存读取，重复读取时无需访问磁盘）
         try:
-            with open(file_path, 'r', encoding='utf-8') as file:
-                lines = file.readlines()
+            if file_stat.st_size <= MAX_CACHED_FILE_SIZE:
+                cached = load_file(file_path, file_stat)
+                if LONE_CR_PATTERN.search(cached.data):
+                    # 单独的 '\r' 也视为换行，与按文本模式读取的 search_in_file 保持相同的行号
+                    selected_lines, total_lines = _split_line_window(cached.text('utf-8'), start_line, count)
+                else:
+                    selected_lines = _read_line_window(cached.data, start_line, count)
+                    total_lines = cached.total_lines
+            else:
+                selected_lines, total_lines = _read_large_file_window(file_path, start_line, count)
         except UnicodeDecodeError:
             return f"错误：文件编码不是UTF-8，无法读取 - {file_path}"
         except PermissionError:
             return f"错误：没有权限读取文件 - {file_path}"
         
-        # 计算实际的结束行号
-        total_lines = len(lines)
-        actual_end_line = min(start_line + count - 1, total_lines)
-        
         # 检查开始行号是否超出文件范围
-        if start_line > total_lines:
+        if not selected_lines:
             return f"错误：开始行号 {start_line} 超出文件总行数 {total_lines}"
         
-        # 提取指定范围的行
-        selected_lines = lines[start_line - 1:actual_end_line]
-        
-        # 格式化输出，添加行号
-        result_lines = []
-        for i, line in enumerate(selected_lines, start=start_line):
-            # 移除行末的换行符，然后添加行号
-            clean_line = line.rstrip('\n\r')
-            result_lines.append(f"{i}: {clean_line}")
+        # 计算实际的结束行号
+        actual_end_line = start_line + len(selected_lines) - 1
         
         # 添加文件信息头部
-        info_header = f"文件路径: {file_path}\n"
-        info_header += f"总行数: {total_lines}\n"
-        info_header += f"显示范围: {start_line}-{actual_end_line}\n"
-        info_header += "-" * 50 + "\n"
+        info_header = (
+            f"文件路径: {file_path}\n"
+            f"总行数: {total_lines}\n"
+            f"显示范围: {start_line}-{actual_end_line}\n"
+            + "-" * 50 + "\n"
+        )
+        
+        # 格式化输出，添加行号
+        body = "\n".join(f"{i}: {line}" for i, line in enumerate(selected_lines, start=start_line))
         
         # 如果读取的行数达到了限制，添加提示
         if actual_end_line < start_line + count - 1:
-            result_lines.append(f"\n注意：文件行数不足，实际读取了 {actual_end_line - start_line + 1} 行")
+            body += f"\n\n注意：文件行数不足，实际读取了 {actual_end_line - start_line + 1} 行"
         
-        return info_header + "\n".join(result_lines)
+        return info_header + body
         
     except Exception as e:
         return f"读取文件时发生未知错误: {str(e)}"
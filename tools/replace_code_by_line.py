@@ -3,11 +3,102 @@
 用于根据行号和代码内容替换文件中的指定行
 """
 
+import mmap
 import os
-from typing import Annotated, List, Dict, Any
+from typing import Annotated, List, Dict, Any, Tuple
+from utils.atomic_writer import write_file_atomic
+from utils.file_cache import LONE_CR_PATTERN, translate_newlines
+from utils.file_stat import stat_regular_file
+from utils.line_counter import count_lines
 from utils.syntax_checker import SyntaxChecker
 
 
+def _splice_lines(file_path: str, replacements: List[Dict[str, Any]]) -> Tuple[List[bytes], int]:
+    """
+    通过内存映射定位需要替换的行，将原文件片段与新代码按顺序拼接
+    
+    未被替换的内容以字节片段原样保留（包括原有的换行符），只有被替换的行会被重新编码。
+    文件中存在单独的 '\r' 时，与 read_text_file 一样将其视为换行：按文本模式统一换行符为 '\n' 后再拼接。
+    行号超过文件行数的替换项会先补齐空行再写入。
+    
+    Args:
+        file_path: 目标文件的完整路径
+        replacements: 按行号从小到大排序的替换列表，每个元素包含 line 和 code 字段
+    
+    Returns:
+        (新文件内容的字节片段列表, 原文件行数)
+    
+    Raises:
+        UnicodeDecodeError: 原文件不是 UTF-8 编码时抛出
+    """
+    chunks = []
+    
+    with open(file_path, 'rb') as file:
+        mapped = None if os.fstat(file.fileno()).st_size == 0 else mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        
+        try:
+            buffer = b'' if mapped is None else mapped
+            
+            # 新代码以 UTF-8 编码写入，原文件（包括将被替换的行）不是 UTF-8 编码时拒绝修改，避免产生混合编码的文件
+            text = str(buffer, 'utf-8')
+            if LONE_CR_PATTERN.search(buffer):
+                buffer = translate_newlines(text).encode('utf-8')
+            del text
+            
+            size = len(buffer)
+            total_lines = count_lines(buffer)
+            
+            line_num = 1
+            line_start = 0
+            prev_end = 0
+            pending = []
+            for item in replacements:
+                if item["line"] > total_lines:
+                    pending.append(item)
+                    continue
+                
+                # 向后查找目标行的起始位置
+                while line_num < item["line"]:
+                    line_start = buffer.find(b'\n', line_start) + 1
+                    line_num += 1
+                
+                newline = buffer.find(b'\n', line_start)
+                line_end = size if newline == -1 else newline + 1
+                
+                # 替换内容（保持原有的换行符）
+                line_ending = b'\r\n' if newline > 0 and buffer[newline - 1:newline] == b'\r' else b'\n'
+                new_code = item["code"].encode('utf-8')
+                if not new_code.endswith(b'\n'):
+                    new_code += line_ending
+                
+                chunks.append(buffer[prev_end:line_start])
+                chunks.append(new_code)
+                prev_end = line_end
+            
+            chunks.append(buffer[prev_end:size])
+            
+            # 原文件最后一行被保留且没有换行符时，扩展前需要先补上换行符
+            missing_final_newline = prev_end < size and buffer[size - 1:size] != b'\n'
+        finally:
+            if mapped is not None:
+                mapped.close()
+    
+    # 行号超过文件当前行数时，在文件末尾补齐空行后写入新代码
+    if pending:
+        if missing_final_newline:
+            chunks.append(b'\n')
+        next_line = total_lines + 1
+        for item in pending:
+            chunks.append(b'\n' * (item["line"] - next_line))
+            new_code = item["code"].encode('utf-8')
+            if not new_code.endswith(b'\n'):
+                new_code += b'\n'
+            chunks.append(new_code)
+            next_line = item["line"] + 1
+    
+    return chunks, total_lines
+
+
 def replace_code_by_line(
     file_path: Annotated[str, "目标文件的完整路径"],
     replacements: Annotated[List[Dict[str, Any]], "替换列表，每个元素必须包含两个必填字段：line（行号，从1开始计数的整数）和 code（新代码内容的字符串）"]
@@ -37,24 +128,10 @@ def replace_code_by_line(
         各种文件操作相关的异常
     """
     try:
-        # 验证文件路径
-        if not file_path:
-            return "错误：文件路径不能为空"
-        
-        # 检查文件是否存在
-        if not os.path.exists(file_path):
-            return f"错误：文件不存在 - {file_path}"
-        
-        # 检查是否为文件（而不是目录）
-        if not os.path.isfile(file_path):
-            return f"错误：指定路径不是文件 - {file_path}"
-        
-        # 检查文件权限
-        if not os.access(file_path, os.R_OK):
-            return f"错误：没有读取权限 - {file_path}"
-        
-        if not os.access(file_path, os.W_OK):
-            return f"错误：没有写入权限 - {file_path}"
+        # 验证文件路径，检查文件是否存在、为普通文件且可写（读取权限在打开文件时检查）
+        file_stat, error = stat_regular_file(file_path, writable=True)
+        if error:
+            return error
         
         # 验证 replacements 参数
         if not isinstance(replacements, list):
@@ -99,48 +176,43 @@ def replace_code_by_line(
             code_content = item["code"]
             validated_replacements.append({"line": line_num, "code": code_content})
         
-        # 读取原文件内容
+        # 检查是否需要进行语法检查
+        file_extension = os.path.splitext(file_path)[1].lower()
+        
+        # 定义文件扩展名到语法检查器的映射
+        syntax_map = {
+            '.lua': 'lua',
+            '.xml': 'xml',
+            '.txt': 'xml'  # .txt 文件使用 XML 语法检查器
+        }
+        
+        # 按行号从小到大排序，按顺序拼接原文件片段与新代码
+        validated_replacements.sort(key=lambda x: x["line"])
+        
+        # 计算最大行号，用于判断是否需要扩展文件
+        max_line_number = validated_replacements[-1]["line"]
+        
+        # 读取原文件内容并拼接新内容（仅定位需要替换的行，其余内容按字节片段原样保留）
         try:
-            with open(file_path, 'r', encoding='utf-8') as file:
-                original_lines = file.readlines()
+            chunks, total_lines = _splice_lines(file_path, validated_replacements)
         except UnicodeDecodeError:
             return f"错误：文件编码不是UTF-8，无法读取 - {file_path}"
         except PermissionError:
-            return f"错误：没有权限读取文件 - {file_path}"
-        
-        total_lines = len(original_lines)
-        
-        # 计算最大行号，用于判断是否需要扩展文件
-        max_line_number = max(item["line"] for item in validated_replacements)
+            return f"错误：没有读取权限 - {file_path}"
         
-        # 按行号从大到小排序，避免替换时行号偏移问题
-        validated_replacements.sort(key=lambda x: x["line"], reverse=True)
+        # 如果最大行号超过文件当前行数，则扩展文件
+        lines_to_add = max(0, max_line_number - total_lines)
         
-        # 创建新的文件内容
-        new_lines = original_lines.copy()
+        updated_bytes = b''.join(chunks)
         
-        # 如果最大行号超过文件当前行数，则扩展文件
-        lines_to_add = 0
-        if max_line_number > total_lines:
-            lines_to_add = max_line_number - total_lines
-            # 添加空行到文件末尾
-            for _ in range(lines_to_add):
-                new_lines.append('\n')
-        
-        for item in validated_replacements:
-            line_num = item["line"]
-            new_code = item["code"]
-            
-            # 替换内容（保持原有的换行符）
-            if not new_code.endswith('\n'):
-                new_code += '\n'
-            
-            new_lines[line_num - 1] = new_code
+        # 语法检查只依赖内存中的内容，在后台线程中与文件写入同时进行（直接传入字节内容，检测器无需再次编码）
+        syntax_future = None
+        if file_extension in syntax_map:
+            syntax_future = SyntaxChecker.check_syntax_async(updated_bytes, syntax_map[file_extension])
         
         # 写入新内容
         try:
-            with open(file_path, 'w', encoding='utf-8') as file:
-                file.writelines(new_lines)
+            write_file_atomic(file_path, updated_bytes)
         except Exception as e:
             return f"错误：写入文件失败 - {str(e)}"
         
@@ -154,38 +226,24 @@ def replace_code_by_line(
             result_info.append(f"扩展后行数: {total_lines + lines_to_add}")
         result_info.append(f"成功替换行数: {len(validated_replacements)}")
         
-        # 检查是否需要进行语法检查
-        file_extension = os.path.splitext(file_path)[1].lower()
-        
-        # 定义文件扩展名到语法检查器的映射
-        syntax_map = {
-            '.lua': 'lua',
-            '.xml': 'xml',
-            '.txt': 'xml'  # .txt 文件使用 XML 语法检查器
-        }
-        
-        if file_extension in syntax_map:
+        if syntax_future is not None:
             language = syntax_map[file_extension]
             result_info.append("")
             result_info.append(f"🔍 {language.upper()} 语法检查结果:")
             
             try:
-                # 读取替换后的文件内容进行语法检查
-                with open(file_path, 'r', encoding='utf-8') as file:
-                    updated_content = file.read()
-                
-                # 调用语法检查器
-                syntax_result = SyntaxChecker.check_syntax(updated_content, language)
+                # 获取后台语法检查的结果
+                syntax_result = syntax_future.result()
                 
                 if syntax_result["is_valid"]:
                     result_info.append("✅ 语法检查通过，代码有效")
                 else:
                     result_info.append("❌ 发现语法错误:")
                     for error in syntax_result["errors"]:
-                        if error["line"] > 0:
-                            result_info.append(f"- 第{error['line']}行，第{error['column']}列: {error['message']}")
+                        if error.line > 0:
+                            result_info.append(f"- 第{error.line}行，第{error.column}列: {error.message}")
                         else:
-                            result_info.append(f"- {error['message']}")
+                            result_info.append(f"- {error.message}")
                             
             except Exception as e:
                 result_info.append(f"⚠️ 语法检查失败: {str(e)}")
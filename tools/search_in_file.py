@@ -3,16 +3,22 @@
 用于在指定文件中搜索字符串，支持正则匹配和精确匹配，返回匹配行号和内容
 """
 
-import os
 import re
 from typing import Annotated
+from utils.file_cache import load_file, trim_cache
+from utils.file_stat import stat_regular_file
+
+# 正则表达式中未被转义的 \A、\Z（只匹配整个字符串的开头和结尾）或前后查找断言 (?=、(?!、(?<=、(?<!
+# （在整个缓冲区上搜索时可以看到相邻行的内容）
+_LINE_SENSITIVE_PATTERN = re.compile(r'(?<!\\)(?:\\\\)*(?:\\[AZ]|\(\?<?[=!])')
 
 
 def search_in_file(
     file_path: Annotated[str, "要搜索的文件的完整路径"],
     search_text: Annotated[str, "要搜索的字符串或正则表达式"],
     match_type: Annotated[str, "匹配类型：'exact'（精确匹配）或 'regex'（正则匹配）"] = "exact",
-    case_sensitive: Annotated[bool, "是否区分大小写，默认为False（不区分）"] = False
+    case_sensitive: Annotated[bool, "是否区分大小写，默认为False（不区分）"] = False,
+    count_all: Annotated[bool, "是否统计全部匹配数，默认为False（找到100行匹配后即停止搜索）"] = False
 ) -> str:
     """
     在指定文件中搜索字符串，支持精确匹配和正则表达式匹配
@@ -22,6 +28,7 @@ def search_in_file(
         search_text: 要搜索的字符串或正则表达式
         match_type: 匹配类型，'exact' 或 'regex'
         case_sensitive: 是否区分大小写
+        count_all: 是否统计全部匹配数，为 False 时找到显示上限数量的匹配行后即停止搜索
     
     Returns:
         包含搜索结果的详细信息字符串，包括匹配行号、内容和统计信息
@@ -30,13 +37,6 @@ def search_in_file(
         各种文件操作和正则表达式相关的异常
     """
     try:
-        # 验证文件路径
-        if not file_path:
-            return "错误：文件路径不能为空"
-        
-        if not isinstance(file_path, str):
-            return "错误：文件路径必须是字符串"
-        
         # 验证搜索文本
         if not isinstance(search_text, str):
             return "错误：搜索文本必须是字符串"
@@ -48,82 +48,106 @@ def search_in_file(
         if match_type not in ["exact", "regex"]:
             return "错误：匹配类型必须是 'exact' 或 'regex'"
         
-        # 检查文件是否存在
-        if not os.path.exists(file_path):
-            return f"错误：文件不存在 - {file_path}"
+        # 验证文件路径，检查文件是否存在且为普通文件（一次 stat 调用完成）
+        file_stat, error = stat_regular_file(file_path)
+        if error:
+            return error
         
-        # 检查是否为文件（而不是目录）
-        if not os.path.isfile(file_path):
-            return f"错误：指定路径不是文件 - {file_path}"
-        
-        # 检查文件权限
-        if not os.access(file_path, os.R_OK):
-            return f"错误：没有权限读取文件 - {file_path}"
-        
-        # 读取文件内容
+        # 读取文件内容（文件未发生变化时使用缓存的内容）
         try:
-            with open(file_path, 'r', encoding='utf-8') as file:
-                lines = file.readlines()
-        except UnicodeDecodeError:
+            cached = load_file(file_path, file_stat)
             try:
-                # 尝试其他编码
-                with open(file_path, 'r', encoding='gbk') as file:
-                    lines = file.readlines()
+                data = cached.text('utf-8')
             except UnicodeDecodeError:
-                return f"错误：文件编码不支持，无法读取 - {file_path}"
+                # 尝试其他编码
+                data = cached.text('gbk')
+            trim_cache()
+        except UnicodeDecodeError:
+            return f"错误：文件编码不支持，无法读取 - {file_path}"
         except PermissionError:
             return f"错误：没有权限读取文件 - {file_path}"
         except Exception as e:
             return f"错误：读取文件失败 - {str(e)}"
         
         # 获取文件总行数
-        total_lines = len(lines)
+        total_lines = data.count('\n')
+        if data and not data.endswith('\n'):
+            total_lines += 1
+        
+        # 准备搜索模式（精确匹配时转义搜索文本，统一使用正则引擎在整个缓冲区上搜索）
+        flags = re.MULTILINE
+        if not case_sensitive:
+            flags |= re.IGNORECASE
         
-        # 准备搜索模式
         if match_type == "regex":
             try:
                 # 编译正则表达式
-                flags = re.IGNORECASE if not case_sensitive else 0
                 pattern = re.compile(search_text, flags)
             except re.error as e:
                 return f"错误：正则表达式语法错误 - {str(e)}"
         else:
             # 精确匹配模式
-            if not case_sensitive:
-                search_text_lower = search_text.lower()
+            pattern = re.compile(re.escape(search_text), flags)
         
         # 搜索匹配行
         matches = []
         max_display = 100  # 最大显示结果数限制
-        
-        for line_num, line in enumerate(lines, 1):
-            line_content = line.rstrip('\n\r')  # 移除行末换行符
-            
-            if match_type == "regex":
-                # 正则匹配
-                if pattern.search(line_content):
-                    matches.append({
-                        'line_num': line_num,
-                        'content': line_content
-                    })
+        total_matches = 0
+        stopped_early = False
+        
+        # 表达式使用 \A、\Z 或前后查找断言时逐行搜索，使其只能看到当前行；否则在整个缓冲区上搜索
+        per_line = match_type == "regex" and _LINE_SENSITIVE_PATTERN.search(search_text) is not None
+        
+        line_num = 1
+        counted_pos = 0
+        pos = 0
+        while pos < len(data):
+            if per_line:
+                line_start = pos
+                line_end = data.find('\n', line_start)
+                if line_end == -1:
+                    line_end = len(data)
+                if not pattern.search(data[line_start:line_end]):
+                    pos = line_end + 1
+                    continue
             else:
-                # 精确匹配
-                if case_sensitive:
-                    if search_text in line_content:
-                        matches.append({
-                            'line_num': line_num,
-                            'content': line_content
-                        })
-                else:
-                    if search_text_lower in line_content.lower():
-                        matches.append({
-                            'line_num': line_num,
-                            'content': line_content
-                        })
+                match = pattern.search(data, pos)
+                if not match:
+                    break
+                
+                # 根据匹配位置确定所在行的范围
+                match_start = match.start()
+                line_start = data.rfind('\n', 0, match_start) + 1
+                if line_start >= len(data):
+                    break
+                line_end = data.find('\n', match_start)
+                if line_end == -1:
+                    line_end = len(data)
+                
+                # 匹配跨越了行尾时，仅在该行的内容中重新确认是否匹配
+                if match.end() > line_end and not pattern.search(data[line_start:line_end]):
+                    pos = line_end + 1
+                    continue
+            
+            line_num += data.count('\n', counted_pos, line_start)
+            counted_pos = line_start
+            total_matches += 1
+            if len(matches) < max_display:
+                matches.append({
+                    'line_num': line_num,
+                    'content': data[line_start:line_end]
+                })
+            
+            # 每行只记录一次，从下一行继续搜索
+            pos = line_end + 1
+            
+            # 不需要统计全部匹配数时，达到显示上限后提前结束搜索
+            if not count_all and total_matches >= max_display and pos < len(data):
+                stopped_early = True
+                break
         
         # 计算显示的匹配项和隐藏的匹配项
-        total_matches = len(matches)
-        displayed_matches = matches[:max_display]
+        displayed_matches = matches
         hidden_count = max(0, total_matches - max_display)
         
         # 构建结果信息
@@ -133,7 +157,10 @@ def search_in_file(
         result_lines.append(f"搜索内容: \"{search_text}\"")
         result_lines.append(f"匹配类型: {'正则匹配' if match_type == 'regex' else '精确匹配'}")
         result_lines.append(f"区分大小写: {'是' if case_sensitive else '否'}")
-        result_lines.append(f"匹配总数: {total_matches}")
+        if stopped_early:
+            result_lines.append(f"匹配总数: 至少 {total_matches}（已达到显示上限，提前停止搜索）")
+        else:
+            result_lines.append(f"匹配总数: {total_matches}")
         
         if hidden_count > 0:
             result_lines.append(f"显示结果: {len(displayed_matches)} 行（还有 {hidden_count} 行匹配项未显示）")
@@ -148,6 +175,9 @@ def search_in_file(
             if hidden_count > 0:
                 result_lines.append("")
                 result_lines.append(f"注意：由于结果过多，仅显示前 {max_display} 行匹配结果")
+            elif stopped_early:
+                result_lines.append("")
+                result_lines.append(f"注意：已找到 {max_display} 行匹配结果，未继续搜索剩余内容；如需统计全部匹配数，请将 count_all 设为 True")
         else:
             result_lines.append("未找到匹配内容")
         
@@ -1,7 +1,43 @@
 """
 Utils package for code operation MCP server
+
+导出的名称在首次访问时才导入对应的子模块（PEP 562 模块级 __getattr__），
+导入其他工具模块不会加载语法检测器
 """
 
-from .syntax_checker import SyntaxChecker
+import importlib
+
+# 导出名称与所在子模块的对应关系
+_EXPORTS = {
+    'SyntaxChecker': 'syntax_checker',
+    'SyntaxErrorInfo': 'syntax_checker',
+    'count_lines': 'line_counter',
+    'write_file_atomic': 'atomic_writer',
+    'stat_regular_file': 'file_stat',
+    'CachedFile': 'file_cache',
+    'load_file': 'file_cache',
+}
+
+__all__ = ['SyntaxChecker', 'SyntaxErrorInfo', 'count_lines', 'write_file_atomic', 'stat_regular_file', 'CachedFile', 'load_file']
+
+
+def __getattr__(name):
+    """
+    按需导入导出的名称
+
+    Args:
+        name: 导出名称
+
+    Returns:
+        子模块中对应的对象
 
-__all__ = ['SyntaxChecker']
+    Raises:
+        AttributeError: 名称不是已导出的名称时抛出
+    """
+    module_name = _EXPORTS.get(name)
+    if module_name is not None:
+        module = importlib.import_module(f".{module_name}", __name__)
+        value = getattr(module, name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
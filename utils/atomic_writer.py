@@ -0,0 +1,114 @@
+"""
+原子写入工具
+先写入同目录下的临时文件，再通过 os.replace() 替换目标文件，避免写入中途失败导致文件损坏
+"""
+
+import os
+import secrets
+import stat
+from typing import Tuple
+
+
+def _write_all(fd: int, data: bytes) -> None:
+    """
+    通过文件描述符写入全部字节内容（绕过缓冲层）
+    """
+    view = memoryview(data)
+    while view:
+        written = os.write(fd, view)
+        view = view[written:]
+
+
+def _create_temp_file(directory: str, name: str) -> Tuple[int, str]:
+    """
+    在目标目录中创建临时文件（文件名随机，已存在时重新生成）
+    
+    创建时的权限位与 open() 新建文件时一致（0o666 由系统按当前 umask 去掉相应的位），无需读取 umask
+    
+    Returns:
+        (已打开的文件描述符, 临时文件路径)
+    """
+    while True:
+        temp_path = os.path.join(directory, f".{name}.{secrets.token_hex(4)}.tmp")
+        try:
+            fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, 'O_BINARY', 0), 0o666)
+        except FileExistsError:
+            continue
+        return fd, temp_path
+
+
+def _write_in_place(file_path: str, data: bytes) -> None:
+    """
+    直接覆盖写入已存在的文件（保留 inode，用于无法通过替换保留硬链接或所有者的情况）
+    """
+    fd = os.open(file_path, os.O_WRONLY | os.O_TRUNC | getattr(os, 'O_BINARY', 0))
+    try:
+        _write_all(fd, data)
+    finally:
+        os.close(fd)
+
+
+def write_file_atomic(file_path: str, data: bytes) -> None:
+    """
+    以原子方式将字节内容写入指定文件
+    
+    内容会先写入与目标文件同目录的临时文件，写入完成后再替换目标文件。
+    路径是符号链接时写入链接指向的文件；目标文件已存在时会保留其权限位和所有者。
+    目标文件有多个硬链接、无法保留其所有者、或无法在其所在目录中创建临时文件（例如目录不可写）时，
+    改为直接覆盖写入已存在的目标文件。
+    
+    Args:
+        file_path: 目标文件的完整路径
+        data: 要写入的字节内容（原样写入，不做换行符转换）
+    
+    Raises:
+        OSError: 写入临时文件或替换目标文件失败时抛出（临时文件会被清理）
+    """
+    real_path = os.path.realpath(file_path)
+    try:
+        target_stat = os.stat(real_path)
+    except FileNotFoundError:
+        target_stat = None
+
+    # 替换会使其他硬链接继续指向旧内容
+    if target_stat is not None and target_stat.st_nlink > 1:
+        _write_in_place(real_path, data)
+        return
+
+    directory, name = os.path.split(real_path)
+    try:
+        fd, temp_path = _create_temp_file(directory, name)
+    except OSError:
+        # 目标文件已存在时仍可直接覆盖写入（只需要文件本身可写）
+        if target_stat is None:
+            raise
+        _write_in_place(real_path, data)
+        return
+    
+    try:
+        try:
+            _write_all(fd, data)
+            # 目标文件已存在时，权限位改为与目标文件一致
+            if target_stat is not None:
+                os.chmod(temp_path, stat.S_IMODE(target_stat.st_mode))
+        finally:
+            os.close(fd)
+        
+        # 保留所有者，没有权限修改所有者时改为直接覆盖写入
+        if target_stat is not None and hasattr(os, 'chown'):
+            temp_stat = os.stat(temp_path)
+            if (temp_stat.st_uid, temp_stat.st_gid) != (target_stat.st_uid, target_stat.st_gid):
+                try:
+                    os.chown(temp_path, target_stat.st_uid, target_stat.st_gid)
+                except PermissionError:
+                    os.unlink(temp_path)
+                    _write_in_place(real_path, data)
+                    return
+        
+        os.replace(temp_path, real_path)
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+        raise
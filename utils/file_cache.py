@@ -0,0 +1,144 @@
+"""
+文件内容缓存
+缓存最近读取过的文件内容，文件未发生变化时重复读取或搜索无需再次访问磁盘
+"""
+
+import os
+import re
+import sys
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from .line_counter import count_lines
+
+# 缓存的最大文件数
+MAX_CACHE_ENTRIES = 16
+
+# 缓存占用内存的上限（字节）
+MAX_CACHE_BYTES = 64 << 20
+
+# 单个文件超过该大小时不进入缓存
+MAX_CACHED_FILE_SIZE = 16 << 20
+
+# 不属于 '\r\n' 的单独 '\r'（旧式 Mac 换行符），按文本模式读取时同样视为换行
+LONE_CR_PATTERN = re.compile(rb'\r(?!\n)')
+
+
+def translate_newlines(text: str) -> str:
+    """
+    按文本模式统一换行符：'\\r\\n' 和单独的 '\\r' 都转换为 '\\n'
+    """
+    if '\r' in text:
+        text = text.replace('\r\n', '\n').replace('\r', '\n')
+    return text
+
+
+class CachedFile:
+    """
+    缓存的文件内容
+    保存原始字节内容，并按需计算总行数和解码后的文本
+    """
+
+    __slots__ = ("mtime_ns", "size", "inode", "data", "_total_lines", "_texts")
+
+    def __init__(self, file_stat: os.stat_result, data: bytes):
+        self.mtime_ns = file_stat.st_mtime_ns
+        self.size = file_stat.st_size
+        self.inode = file_stat.st_ino
+        self.data = data
+        self._total_lines: Optional[int] = None
+        self._texts: Dict[str, str] = {}
+
+    def matches(self, file_stat: os.stat_result) -> bool:
+        """
+        判断缓存内容是否与文件当前状态一致
+
+        Args:
+            file_stat: 文件当前的状态信息
+
+        Returns:
+            修改时间、大小和 inode 均未变化时返回 True
+        """
+        return (
+            self.mtime_ns == file_stat.st_mtime_ns
+            and self.size == file_stat.st_size
+            and self.inode == file_stat.st_ino
+        )
+
+    @property
+    def total_lines(self) -> int:
+        """文件总行数（首次访问时计算）"""
+        if self._total_lines is None:
+            self._total_lines = count_lines(self.data)
+        return self._total_lines
+
+    def text(self, encoding: str) -> str:
+        """
+        获取按指定编码解码后的文本，换行符按文本模式统一转换为 '\\n'
+
+        Args:
+            encoding: 文本编码
+
+        Returns:
+            解码后的文本内容
+
+        Raises:
+            UnicodeDecodeError: 内容无法按指定编码解码时抛出
+        """
+        text = self._texts.get(encoding)
+        if text is None:
+            text = translate_newlines(self.data.decode(encoding))
+            self._texts[encoding] = text
+        return text
+
+    @property
+    def memory_size(self) -> int:
+        """缓存内容占用的内存大小（字节）"""
+        return len(self.data) + sum(sys.getsizeof(text) for text in self._texts.values())
+
+
+_file_cache: "OrderedDict[str, CachedFile]" = OrderedDict()
+
+
+def load_file(file_path: str, file_stat: Optional[os.stat_result] = None) -> CachedFile:
+    """
+    读取文件内容，文件未发生变化时直接返回缓存的内容
+
+    Args:
+        file_path: 文件的完整路径
+        file_stat: 调用方已获取的文件状态信息，为 None 时重新获取
+
+    Returns:
+        文件内容缓存对象
+
+    Raises:
+        OSError: 文件读取失败时抛出
+    """
+    if file_stat is None:
+        file_stat = os.stat(file_path)
+
+    key = os.path.abspath(file_path)
+    cached = _file_cache.get(key)
+    if cached is not None and cached.matches(file_stat):
+        _file_cache.move_to_end(key)
+        return cached
+
+    with open(file_path, 'rb') as file:
+        cached = CachedFile(os.fstat(file.fileno()), file.read())
+
+    _file_cache.pop(key, None)
+    if cached.size <= MAX_CACHED_FILE_SIZE:
+        _file_cache[key] = cached
+        trim_cache()
+    return cached
+
+
+def trim_cache() -> None:
+    """
+    按最近最少使用的顺序淘汰缓存，使缓存文件数和内存占用不超过上限
+    """
+    while _file_cache and (
+        len(_file_cache) > MAX_CACHE_ENTRIES
+        or sum(cached.memory_size for cached in _file_cache.values()) > MAX_CACHE_BYTES
+    ):
+        _file_cache.popitem(last=False)
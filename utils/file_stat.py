@@ -0,0 +1,49 @@
+"""
+文件状态检查工具
+通过一次 os.stat() 调用完成文件存在性与类型检查，减少重复的文件系统调用
+"""
+
+import os
+import stat
+from typing import Optional, Tuple
+
+
+def stat_regular_file(file_path: str, writable: bool = False) -> Tuple[Optional[os.stat_result], Optional[str]]:
+    """
+    验证文件路径并获取普通文件的状态信息
+    
+    依次检查路径是否为空、文件是否存在、是否为普通文件，以及（可选）是否有写入权限，
+    各工具共用同一套检查和错误信息。读取权限不在此检查，由打开文件时的 PermissionError 处理。
+    
+    Args:
+        file_path: 文件的完整路径
+        writable: 是否要求文件可写
+    
+    Returns:
+        (文件状态信息, None)；检查失败时返回 (None, 错误信息)
+    """
+    # 验证文件路径
+    if not file_path:
+        return None, "错误：文件路径不能为空"
+    
+    if not isinstance(file_path, str):
+        return None, "错误：文件路径必须是字符串"
+    
+    try:
+        file_stat = os.stat(file_path)
+    except FileNotFoundError:
+        return None, f"错误：文件不存在 - {file_path}"
+    except PermissionError:
+        return None, f"错误：没有权限访问文件 - {file_path}"
+    except OSError as e:
+        return None, f"错误：无法获取文件信息 - {str(e)}"
+    
+    # 检查是否为文件（而不是目录）
+    if not stat.S_ISREG(file_stat.st_mode):
+        return None, f"错误：指定路径不是文件 - {file_path}"
+    
+    # 检查文件权限
+    if writable and not os.access(file_path, os.W_OK):
+        return None, f"错误：没有写入权限 - {file_path}"
+    
+    return file_stat, None
@@ -0,0 +1,29 @@
+"""
+行数统计工具
+以字节方式统计文件内容的行数，避免对整个文件进行 UTF-8 解码
+"""
+
+import mmap
+from typing import Union
+
+# 分块统计时每次处理的字节数
+CHUNK_SIZE = 1 << 20
+
+
+def count_lines(buffer: Union[bytes, mmap.mmap]) -> int:
+    """
+    以分块方式统计缓冲区（通常是文件的内存映射）中的总行数
+    
+    Args:
+        buffer: 文件内容的字节缓冲区或内存映射
+    
+    Returns:
+        总行数（最后一行没有换行符时也计为一行）
+    """
+    size = len(buffer)
+    total = 0
+    for offset in range(0, size, CHUNK_SIZE):
+        total += buffer[offset:offset + CHUNK_SIZE].count(b'\n')
+    if size and buffer[size - 1:size] != b'\n':
+        total += 1
+    return total
@@ -3,8 +3,19 @@
 使用 Tree-sitter 库进行代码语法错误检测
 """
 
+import hashlib
+import importlib
+import importlib.util
 import logging
-from typing import Dict, List, Any, Optional
+import os
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from queue import Empty, Full, LifoQueue
+from types import MappingProxyType
+from typing import Callable, Dict, Iterator, List, Any, Mapping, NamedTuple, Optional, Tuple, Union
 from typing_extensions import Annotated
 
 try:
@@ -17,21 +28,213 @@ except ImportError:
     Language = None
     Parser = None
 
-try:
-    import tree_sitter_lua
-    LUA_LANGUAGE_AVAILABLE = True
-except ImportError:
-    LUA_LANGUAGE_AVAILABLE = False
-    tree_sitter_lua = None
+# 语言包只检查是否已安装，首次检测对应语言时才导入（加载语言包的共享库），不检测的语言不产生导入开销
+LUA_LANGUAGE_AVAILABLE = importlib.util.find_spec("tree_sitter_lua") is not None
+XML_LANGUAGE_AVAILABLE = importlib.util.find_spec("tree_sitter_xml") is not None
+
+logger = logging.getLogger(__name__)
+
+# Lua 括号预检使用的括号匹配模式
+_BRACKET_PATTERN = re.compile(rb'[()\[\]{}]')
+
+# 语法检查结果缓存的最大条目数
+RESULT_CACHE_SIZE = 256
+
+# 每种语言的解析器池中保留的空闲解析器数量上限
+PARSER_POOL_SIZE = 8
+
+# 错误信息中引用的出错文本的最大长度（字符）
+ERROR_TEXT_MAX_LENGTH = 80
+
+# 增量解析时缓存的语法树（按文档）的最大条目数
+TREE_CACHE_SIZE = 16
 
+# 缓存的语法树对应的源代码总字节数上限（语法树占用的内存约为源代码的数十倍），超过上限的文档不缓存语法树
+TREE_CACHE_MAX_BYTES = 1 << 20
+
+# 语法检查接受的最大代码大小（字节），超过时不解析直接返回错误，可通过环境变量 CODE_MCP_MAX_SYNTAX_CHECK_BYTES 调整
 try:
-    import tree_sitter_xml
-    XML_LANGUAGE_AVAILABLE = True
-except ImportError:
-    XML_LANGUAGE_AVAILABLE = False
-    tree_sitter_xml = None
+    MAX_CODE_BYTES = int(os.environ.get("CODE_MCP_MAX_SYNTAX_CHECK_BYTES", 4 << 20))
+except ValueError:
+    MAX_CODE_BYTES = 4 << 20
 
-logger = logging.getLogger(__name__)
+# 依赖库状态在导入时确定，之后不会变化
+_DEPENDENCY_STATUS = {
+    "tree_sitter": TREE_SITTER_AVAILABLE,
+    "tree_sitter_lua": LUA_LANGUAGE_AVAILABLE,
+    "tree_sitter_xml": XML_LANGUAGE_AVAILABLE
+}
+_SUPPORTED_LANGUAGES = [
+    language
+    for language, available in (("lua", LUA_LANGUAGE_AVAILABLE), ("xml", XML_LANGUAGE_AVAILABLE))
+    if TREE_SITTER_AVAILABLE and available
+]
+
+
+def _load_language(name: str, package_name: str, factory_name: str) -> Optional[Language]:
+    """
+    导入语言包并创建 Tree-sitter 语言定义，失败时记录日志并返回 None
+    
+    Args:
+        name: 语言名称（用于日志）
+        package_name: 语言包的模块名
+        factory_name: 语言包中返回语言指针的函数名
+        
+    Returns:
+        Language: 语言定义，如果导入或初始化失败则返回 None
+    """
+    try:
+        language = Language(getattr(importlib.import_module(package_name), factory_name)())
+    except Exception as e:
+        logger.error(f"Failed to initialize {name} language: {e}")
+        return None
+    logger.info(f"{name} language initialized successfully")
+    return language
+
+
+# 语言定义是不可变对象，首次检测对应语言时创建一次（见 _not_ready_result），供所有线程的解析器共享
+_LANGUAGES: Dict[str, Optional[Language]] = {}
+
+
+class SyntaxErrorInfo(NamedTuple):
+    """
+    单个语法错误的信息
+    不可变且可哈希，占用内存比字典小，需要字典格式时调用 to_dict()
+    错误描述只保存模板和参数，读取 message 时才格式化，收集大量错误时无需逐条拼接字符串
+    """
+    
+    line: int                # 错误行号（从1开始）
+    column: int              # 错误列号（从1开始）
+    message_template: str    # 错误描述模板，可引用 {line}、{column}、{node_type}、{detail}
+    type: str                # 错误类型
+    node_type: str           # 错误节点类型
+    detail: str = ""         # 错误描述中引用的附加内容（例如出错的文本）
+    
+    @property
+    def message(self) -> str:
+        """错误描述"""
+        return self.message_template.format(
+            line=self.line, column=self.column, node_type=self.node_type, detail=self.detail
+        )
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为普通字典（例如需要序列化为 JSON 时）"""
+        return {
+            "line": self.line,
+            "column": self.column,
+            "message": self.message,
+            "type": self.type,
+            "node_type": self.node_type
+        }
+
+
+def _frozen_result(result: Mapping[str, Any]) -> Mapping[str, Any]:
+    """
+    将检测结果转换为只读映射（错误列表转换为元组），可以在多次调用之间安全共享
+    """
+    if isinstance(result, MappingProxyType):
+        return result
+    return MappingProxyType({**result, "errors": tuple(result["errors"])})
+
+
+# 固定的检测结果在导入时创建一次，之后直接返回共享的只读实例
+_CLEAN_RESULTS = {
+    language: _frozen_result({
+        "has_errors": False,
+        "is_valid": True,
+        "errors": [],
+        "language": language,
+        "available": True
+    })
+    for language in ("lua", "xml")
+}
+_LUA_UNAVAILABLE_RESULT = _frozen_result({
+    "has_errors": True,
+    "is_valid": False,
+    "errors": [SyntaxErrorInfo(
+        line=0,
+        column=0,
+        message_template="Tree-sitter Lua language is not available. Please install: pip install tree-sitter-lua",
+        type="dependency_error",
+        node_type="missing_lua_parser"
+    )],
+    "language": "lua",
+    "available": False
+})
+_LUA_INIT_FAILED_RESULT = _frozen_result({
+    "has_errors": True,
+    "is_valid": False,
+    "errors": [SyntaxErrorInfo(
+        line=0,
+        column=0,
+        message_template="Failed to initialize Lua parser",
+        type="parser_error",
+        node_type="initialization_error"
+    )],
+    "language": "lua",
+    "available": False
+})
+_XML_UNAVAILABLE_RESULT = _frozen_result({
+    "has_errors": True,
+    "is_valid": False,
+    "errors": [SyntaxErrorInfo(
+        line=0,
+        column=0,
+        message_template="Tree-sitter XML language is not available. Please install: pip install tree-sitter-xml",
+        type="dependency_error",
+        node_type="missing_xml_parser"
+    )],
+    "language": "xml",
+    "available": False
+})
+_XML_INIT_FAILED_RESULT = _frozen_result({
+    "has_errors": True,
+    "is_valid": False,
+    "errors": [SyntaxErrorInfo(
+        line=0,
+        column=0,
+        message_template="Failed to initialize XML parser",
+        type="parser_error",
+        node_type="initialization_error"
+    )],
+    "language": "xml",
+    "available": False
+})
+
+# 各语言的语言包信息：(日志名称, 模块名, 语言指针函数名, 是否已安装, 未安装时的结果, 初始化失败时的结果)
+_LANGUAGE_PACKAGES = {
+    "lua": ("Lua", "tree_sitter_lua", "language", LUA_LANGUAGE_AVAILABLE, _LUA_UNAVAILABLE_RESULT, _LUA_INIT_FAILED_RESULT),
+    "xml": ("XML", "tree_sitter_xml", "language_xml", XML_LANGUAGE_AVAILABLE, _XML_UNAVAILABLE_RESULT, _XML_INIT_FAILED_RESULT)
+}
+
+# 各语言的可用性在首次检测时确定：语言可用时为 None，否则为对应的错误结果，之后每次检测只需查找一次
+_NOT_READY_RESULTS: Dict[str, Optional[Mapping[str, Any]]] = {}
+_language_lock = threading.Lock()
+
+
+def _not_ready_result(language: str) -> Optional[Mapping[str, Any]]:
+    """
+    确认语言可用，首次调用时导入语言包并创建语言定义（加锁，避免并发调用重复加载）
+    
+    Args:
+        language: 语言名称，'lua' 或 'xml'
+        
+    Returns:
+        语言可用时返回 None，语言包未安装或初始化失败时返回对应的错误结果
+    """
+    try:
+        return _NOT_READY_RESULTS[language]
+    except KeyError:
+        pass
+    with _language_lock:
+        if language not in _NOT_READY_RESULTS:
+            name, package_name, factory_name, available, unavailable_result, init_failed_result = _LANGUAGE_PACKAGES[language]
+            if not available:
+                _NOT_READY_RESULTS[language] = unavailable_result
+            else:
+                _LANGUAGES[language] = _load_language(name, package_name, factory_name) if TREE_SITTER_AVAILABLE else None
+                _NOT_READY_RESULTS[language] = init_failed_result if _LANGUAGES[language] is None else None
+    return _NOT_READY_RESULTS[language]
 
 
 class SyntaxChecker:
@@ -41,302 +244,799 @@ class SyntaxChecker:
     支持的语言：Lua, XML
     """
     
-    _lua_parser: Optional[Parser] = None
-    _xml_parser: Optional[Parser] = None
+    _parser_pools: "Dict[str, LifoQueue[Parser]]" = {
+        language: LifoQueue(maxsize=PARSER_POOL_SIZE)
+        for language in _LANGUAGE_PACKAGES
+    }
+    _result_cache: "OrderedDict[Tuple[str, bytes], Mapping[str, Any]]" = OrderedDict()
+    _executor: Optional[ThreadPoolExecutor] = None
+    _executor_lock = threading.Lock()
+    _latest_checks: "Dict[Tuple[str, str], Future[Mapping[str, Any]]]" = {}
+    _tree_cache: "OrderedDict[Tuple[str, str], Tuple[bytes, Any]]" = OrderedDict()
+    _cache_lock = threading.Lock()
     
     @classmethod
-    def _get_lua_parser(cls) -> Optional[Parser]:
+    @contextmanager
+    def _borrow_parser(cls, language: str) -> Iterator[Parser]:
         """
-        获取 Lua 解析器实例（单例模式）
+        从解析器池中借用一个解析器，使用完毕后自动归还
         
-        Returns:
-            Parser: Lua 解析器实例，如果初始化失败则返回 None
+        Args:
+            language: 语言名称，'lua' 或 'xml'（调用前需确认对应语言定义可用）
+            
+        Yields:
+            Parser: 当前线程独占使用的解析器实例
             
         Note:
-            使用单例模式避免重复创建解析器实例，提高性能
-            首次调用时会初始化解析器，后续调用直接返回缓存的实例
+            解析器实例不是线程安全的，每个线程借用各自的实例；池为空时创建新的解析器，
+            池已满时多余的解析器直接丢弃
         """
-        if not TREE_SITTER_AVAILABLE or not LUA_LANGUAGE_AVAILABLE:
-            return None
-            
-        if cls._lua_parser is None:
+        pool = cls._parser_pools[language]
+        try:
+            parser = pool.get_nowait()
+        except Empty:
+            parser = Parser(_LANGUAGES[language])
+        try:
+            yield parser
+        finally:
             try:
-                # 获取 Lua 语言定义
-                lua_language = Language(tree_sitter_lua.language())
-                
-                # 创建解析器
-                cls._lua_parser = Parser(lua_language)
-                logger.info("Lua parser initialized successfully")
-            except Exception as e:
-                logger.error(f"Failed to initialize Lua parser: {e}")
-                return None
-                
-        return cls._lua_parser
+                pool.put_nowait(parser)
+            except Full:
+                pass
     
     @classmethod
-    def _get_xml_parser(cls) -> Optional[Parser]:
+    def _get_executor(cls) -> ThreadPoolExecutor:
         """
-        获取 XML 解析器实例（单例模式）
+        获取后台语法检测线程池（单例模式，首次创建时加锁，避免并发调用创建多个线程池）
         
         Returns:
-            Parser: XML 解析器实例，如果初始化失败则返回 None
+            ThreadPoolExecutor: 使用默认工作线程数的线程池，不同调用的检测可以并行进行
+        """
+        if cls._executor is None:
+            with cls._executor_lock:
+                if cls._executor is None:
+                    cls._executor = ThreadPoolExecutor(thread_name_prefix="syntax-checker")
+        return cls._executor
+    
+    @classmethod
+    def _check_after(
+        cls,
+        previous: "Optional[Future[Mapping[str, Any]]]",
+        code: Union[str, bytes],
+        language: str,
+        doc_id: str
+    ) -> Mapping[str, Any]:
+        """
+        等待同一文档上一次提交的后台检测完成后再检测，保证增量解析总是基于最近一次的语法树
+        
+        线程池按提交顺序取出任务，上一次的检测总是先于本次开始执行，等待不会造成死锁
+        """
+        if previous is not None:
+            wait((previous,))
+        return cls.check_syntax(code, language, doc_id)
+    
+    @classmethod
+    def _forget_check(cls, key: Tuple[str, str], future: "Future[Mapping[str, Any]]") -> None:
+        """
+        文档最近一次提交的后台检测完成后移除其记录
+        """
+        with cls._cache_lock:
+            if cls._latest_checks.get(key) is future:
+                del cls._latest_checks[key]
+    
+    @staticmethod
+    def _error_text(code_bytes: bytes, node: Any) -> str:
+        """
+        获取错误节点在其起始行内的文本（直接按字节偏移切片，最多保留 ERROR_TEXT_MAX_LENGTH 个字符）
+        
+        每个 UTF-8 字符最多 4 个字节，查找换行和切片都只需覆盖 4 * ERROR_TEXT_MAX_LENGTH 个字节，
+        错误节点很大（例如压缩成一行的文件）时不会复制和解码整个节点
+        """
+        start_byte = node.start_byte
+        limit_byte = min(node.end_byte, start_byte + 4 * ERROR_TEXT_MAX_LENGTH)
+        end_byte = code_bytes.find(b'\n', start_byte, limit_byte)
+        if end_byte == -1:
+            end_byte = limit_byte
+        return code_bytes[start_byte:end_byte].decode('utf-8', errors='replace')[:ERROR_TEXT_MAX_LENGTH]
+    
+    @staticmethod
+    def _input_too_large_result(size: int, language: str) -> Mapping[str, Any]:
+        """
+        生成代码超过 MAX_CODE_BYTES 时返回的检测结果
+        """
+        logger.warning(f"Skipped {language} syntax check: code size {size} bytes exceeds limit {MAX_CODE_BYTES} bytes")
+        return _frozen_result({
+            "has_errors": True,
+            "is_valid": False,
+            "errors": [SyntaxErrorInfo(
+                line=0,
+                column=0,
+                message_template="Code is too large for syntax checking: {detail}",
+                type="input_too_large",
+                node_type="input_size",
+                detail=f"{size} bytes (limit: {MAX_CODE_BYTES} bytes)"
+            )],
+            "language": language,
+            "available": True
+        })
+    
+    @staticmethod
+    def _point_at(code_bytes: bytes, offset: int) -> Tuple[int, int]:
+        """
+        计算字节偏移量对应的 (行, 列) 位置（均从0开始，列以字节计）
+        """
+        row = code_bytes.count(b'\n', 0, offset)
+        column = offset - (code_bytes.rfind(b'\n', 0, offset) + 1)
+        return row, column
+    
+    @staticmethod
+    def _diff_edit(old_bytes: bytes, new_bytes: bytes) -> Dict[str, Any]:
+        """
+        根据新旧内容的公共前缀和公共后缀计算单个编辑区间
+        
+        Args:
+            old_bytes: 上次解析的内容
+            new_bytes: 本次要解析的内容
             
-        Note:
-            使用单例模式避免重复创建解析器实例，提高性能
-            首次调用时会初始化解析器，后续调用直接返回缓存的实例
-            XML 解析器能够正确处理 XML 注释、标签匹配等语法结构
+        Returns:
+            可直接传给 Tree.edit() 的编辑参数字典
         """
-        if not TREE_SITTER_AVAILABLE or not XML_LANGUAGE_AVAILABLE:
-            return None
+        # 二分查找公共前缀长度（切片比较在 C 层完成）
+        low, high = 0, min(len(old_bytes), len(new_bytes))
+        while low < high:
+            mid = (low + high + 1) // 2
+            if old_bytes[:mid] == new_bytes[:mid]:
+                low = mid
+            else:
+                high = mid - 1
+        prefix = low
+        
+        # 二分查找公共后缀长度（不与公共前缀重叠）
+        low, high = 0, min(len(old_bytes), len(new_bytes)) - prefix
+        while low < high:
+            mid = (low + high + 1) // 2
+            if old_bytes[len(old_bytes) - mid:] == new_bytes[len(new_bytes) - mid:]:
+                low = mid
+            else:
+                high = mid - 1
+        suffix = low
+        
+        old_end = len(old_bytes) - suffix
+        new_end = len(new_bytes) - suffix
+        return {
+            "start_byte": prefix,
+            "old_end_byte": old_end,
+            "new_end_byte": new_end,
+            "start_point": SyntaxChecker._point_at(new_bytes, prefix),
+            "old_end_point": SyntaxChecker._point_at(old_bytes, old_end),
+            "new_end_point": SyntaxChecker._point_at(new_bytes, new_end)
+        }
+    
+    @classmethod
+    def _discard_tree(cls, language: str, doc_id: Optional[str]) -> None:
+        """
+        丢弃文档缓存的语法树（未解析就返回结果时调用，之后的编辑列表不再以缓存的语法树为基准，下次检测完整解析）
+        """
+        if doc_id is not None:
+            with cls._cache_lock:
+                cls._tree_cache.pop((language, doc_id), None)
+    
+    @classmethod
+    def _parse(
+        cls,
+        parser: Parser,
+        code_bytes: bytes,
+        language: str,
+        doc_id: Optional[str],
+        edits: Optional[List[Dict[str, Any]]]
+    ) -> Any:
+        """
+        解析代码，提供 doc_id 时基于该文档上次的语法树进行增量解析
+        
+        Args:
+            parser: 对应语言的解析器
+            code_bytes: 要解析的代码字节串
+            language: 语言名称，与 doc_id 一起作为语法树缓存的键
+            doc_id: 文档标识，为 None 时直接完整解析
+            edits: 自上次解析以来的编辑列表，为 None 时根据前后内容自动计算
             
-        if cls._xml_parser is None:
-            try:
-                # 获取 XML 语言定义
-                xml_language = Language(tree_sitter_xml.language_xml())
-                
-                # 创建解析器
-                cls._xml_parser = Parser(xml_language)
-                logger.info("XML parser initialized successfully")
-            except Exception as e:
-                logger.error(f"Failed to initialize XML parser: {e}")
-                return None
-                
-        return cls._xml_parser
+        Returns:
+            解析得到的语法树
+        """
+        if doc_id is None:
+            return parser.parse(code_bytes)
+        
+        cache_key = (language, doc_id)
+        with cls._cache_lock:
+            cached = cls._tree_cache.pop(cache_key, None)
+        if cached is None:
+            tree = parser.parse(code_bytes)
+        else:
+            old_bytes, old_tree = cached
+            if old_bytes == code_bytes:
+                tree = old_tree
+            else:
+                for edit in (edits if edits is not None else [cls._diff_edit(old_bytes, code_bytes)]):
+                    old_tree.edit(**edit)
+                tree = parser.parse(code_bytes, old_tree)
+        
+        with cls._cache_lock:
+            if len(code_bytes) <= TREE_CACHE_MAX_BYTES:
+                cls._tree_cache[cache_key] = (code_bytes, tree)
+            while cls._tree_cache and (
+                len(cls._tree_cache) > TREE_CACHE_SIZE
+                or sum(len(cached_bytes) for cached_bytes, _ in cls._tree_cache.values()) > TREE_CACHE_MAX_BYTES
+            ):
+                cls._tree_cache.popitem(last=False)
+        return tree
+    
+    @classmethod
+    def check_syntax_async(
+        cls,
+        code: Annotated[Union[str, bytes], "要检测的代码（字符串或 UTF-8 编码的字节内容）"],
+        language: Annotated[str, "编程语言类型，目前支持 'lua', 'xml'"],
+        doc_id: Annotated[Optional[str], "文档标识（例如文件路径），用于增量解析"] = None
+    ) -> "Future[Mapping[str, Any]]":
+        """
+        在后台线程中检测代码语法错误
+        
+        调用方可以在检测进行的同时执行其他工作（例如写入文件），之后通过 Future.result() 获取结果
+        
+        Args:
+            code: 要检测的代码，可以是字符串或 UTF-8 编码的字节内容（直接传入从文件读取的字节可省去解码再编码）
+            language: 编程语言类型，目前支持 'lua', 'xml'
+            doc_id: 文档标识（例如文件路径），同一文档的后续检测会复用上次的语法树进行增量解析
+            
+        Returns:
+            Future: 结果格式与 check_syntax 相同
+        """
+        if doc_id is None:
+            return cls._get_executor().submit(cls.check_syntax, code, language)
+        
+        # 同一文档的检测按提交顺序执行，不同文档和不提供 doc_id 的检测并行进行
+        key = (language.lower(), doc_id)
+        with cls._cache_lock:
+            future = cls._get_executor().submit(cls._check_after, cls._latest_checks.get(key), code, language, doc_id)
+            cls._latest_checks[key] = future
+        future.add_done_callback(lambda done: cls._forget_check(key, done))
+        return future
     
     @staticmethod
     def check_syntax(
-        code: Annotated[str, "要检测的代码字符串"], 
-        language: Annotated[str, "编程语言类型，目前支持 'lua', 'xml'"]
-    ) -> Dict[str, Any]:
+        code: Annotated[Union[str, bytes], "要检测的代码（字符串或 UTF-8 编码的字节内容）"], 
+        language: Annotated[str, "编程语言类型，目前支持 'lua', 'xml'"],
+        doc_id: Annotated[Optional[str], "文档标识（例如文件路径），用于增量解析"] = None,
+        edits: Annotated[Optional[List[Dict[str, Any]]], "自上次检测以来的编辑列表，格式与 Tree.edit() 的参数一致"] = None
+    ) -> Mapping[str, Any]:
         """
         检测代码语法错误
         
         Args:
-            code: 要检测的代码字符串
+            code: 要检测的代码，可以是字符串或 UTF-8 编码的字节内容（直接传入从文件读取的字节可省去解码再编码）
             language: 编程语言类型，目前支持 'lua', 'xml'
+            doc_id: 文档标识（例如文件路径），同一文档的后续检测会复用上次的语法树进行增量解析
+            edits: 自上次检测以来的编辑列表，每项包含 start_byte、old_end_byte、new_end_byte、
+                start_point、old_end_point、new_end_point；为 None 时根据前后内容自动计算
             
         Returns:
-            包含检测结果的字典，格式如下：
+            包含检测结果的映射，格式如下：
             {
                 "has_errors": bool,           # 是否有语法错误
                 "is_valid": bool,             # 代码是否有效
-                "errors": [                   # 错误列表
-                    {
-                        "line": int,          # 错误行号（从1开始）
-                        "column": int,        # 错误列号（从1开始）
-                        "message": str,       # 错误描述
-                        "type": str,          # 错误类型
-                        "node_type": str      # 错误节点类型
-                    }
-                ],
+                "errors": (                   # 错误列表
+                    SyntaxErrorInfo(
+                        line=int,             # 错误行号（从1开始）
+                        column=int,           # 错误列号（从1开始）
+                        message=str,          # 错误描述（属性，读取时格式化）
+                        type=str,             # 错误类型
+                        node_type=str         # 错误节点类型
+                    ),
+                ),
                 "language": str,              # 检测的语言
                 "available": bool             # Tree-sitter 是否可用
             }
+            
+        Note:
+            返回的结果是只读映射（错误列表为元组），可能与缓存及其他调用方共享；
+            需要修改时请先复制，例如 dict(result)；错误项可通过 SyntaxErrorInfo.to_dict() 转换为字典
         """
         try:
             # 检查依赖是否可用
             if not TREE_SITTER_AVAILABLE:
-                return {
+                return _frozen_result({
                     "has_errors": True,
                     "is_valid": False,
-                    "errors": [{
-                        "line": 0,
-                        "column": 0,
-                        "message": "Tree-sitter library is not available. Please install: pip install tree-sitter",
-                        "type": "dependency_error",
-                        "node_type": "missing_dependency"
-                    }],
+                    "errors": [SyntaxErrorInfo(
+                        line=0,
+                        column=0,
+                        message_template="Tree-sitter library is not available. Please install: pip install tree-sitter",
+                        type="dependency_error",
+                        node_type="missing_dependency"
+                    )],
                     "language": language,
                     "available": False
-                }
+                })
             
-            # 根据语言类型调用相应的检测方法
-            if language.lower() == "lua":
-                return SyntaxChecker.check_lua_syntax(code)
-            elif language.lower() == "xml":
-                return SyntaxChecker.check_xml_syntax(code)
+            # 只编码一次，之后的哈希、解析和错误文本提取都使用同一份字节内容
+            code_bytes = code.encode('utf-8') if isinstance(code, str) else code
+            
+            # 代码过大时不解析（也不计算哈希），避免占用大量内存和长时间阻塞
+            language_name = language.lower()
+            if len(code_bytes) > MAX_CODE_BYTES:
+                SyntaxChecker._discard_tree(language_name, doc_id)
+                return SyntaxChecker._input_too_large_result(len(code_bytes), language)
+            
+            # 相同语言、相同内容的检测结果直接从缓存返回，避免重复解析；
+            # 提供 doc_id 时始终经过增量解析，使文档的语法树与本次内容保持一致（调用方之后的编辑列表以本次内容为基准）
+            cache_key = (language_name, hashlib.blake2b(code_bytes, digest_size=16).digest())
+            if doc_id is None:
+                # 空的 Lua 代码总是有效的，无需解析（空的 XML 文档缺少根元素，仍按正常流程检测）
+                if not code_bytes and language_name == "lua" and _not_ready_result("lua") is None:
+                    return _CLEAN_RESULTS["lua"]
+                
+                with SyntaxChecker._cache_lock:
+                    cached = SyntaxChecker._result_cache.get(cache_key)
+                    if cached is not None:
+                        SyntaxChecker._result_cache.move_to_end(cache_key)
+                if cached is not None:
+                    return cached
+            
+            # 根据语言类型直接调用相应的检测实现，依赖检查只在这里进行一次，异常由外层统一处理
+            if language_name == "lua":
+                not_ready = _not_ready_result("lua")
+                if not_ready is not None:
+                    return not_ready
+                result = SyntaxChecker._check_lua_impl(code_bytes, True, doc_id, edits)
+            elif language_name == "xml":
+                not_ready = _not_ready_result("xml")
+                if not_ready is not None:
+                    return not_ready
+                result = SyntaxChecker._check_xml_impl(code_bytes, doc_id, edits)
             else:
-                return {
+                return _frozen_result({
                     "has_errors": True,
                     "is_valid": False,
-                    "errors": [{
-                        "line": 0,
-                        "column": 0,
-                        "message": f"Unsupported language: {language}. Currently supported: 'lua', 'xml'.",
-                        "type": "unsupported_language",
-                        "node_type": "language_error"
-                    }],
+                    "errors": [SyntaxErrorInfo(
+                        line=0,
+                        column=0,
+                        message_template="Unsupported language: {detail}. Currently supported: 'lua', 'xml'.",
+                        detail=language,
+                        type="unsupported_language",
+                        node_type="language_error"
+                    )],
                     "language": language,
                     "available": True
-                }
+                })
+            
+            # 结果转换为只读映射后才能在缓存命中时直接共享，仅缓存解析器实际完成检测的结果
+            result = _frozen_result(result)
+            if result["available"] and not any(error.type == "internal_error" for error in result["errors"]):
+                with SyntaxChecker._cache_lock:
+                    SyntaxChecker._result_cache[cache_key] = result
+                    if len(SyntaxChecker._result_cache) > RESULT_CACHE_SIZE:
+                        SyntaxChecker._result_cache.popitem(last=False)
+            
+            return result
                 
         except Exception as e:
             logger.error(f"Error in syntax checking: {e}")
-            return {
+            return _frozen_result({
                 "has_errors": True,
                 "is_valid": False,
-                "errors": [{
-                    "line": 0,
-                    "column": 0,
-                    "message": f"Internal error during syntax checking: {str(e)}",
-                    "type": "internal_error",
-                    "node_type": "exception"
-                }],
+                "errors": [SyntaxErrorInfo(
+                    line=0,
+                    column=0,
+                    message_template="Internal error during syntax checking: {detail}",
+                    detail=str(e),
+                    type="internal_error",
+                    node_type="exception"
+                )],
                 "language": language,
                 "available": TREE_SITTER_AVAILABLE
-            }
+            })
     
     @staticmethod
-    def check_lua_syntax(code: Annotated[str, "要检测的 Lua 代码字符串"]) -> Dict[str, Any]:
+    def check_syntax_incremental(
+        old_code: Annotated[Union[str, bytes], "修改前的代码（字符串或 UTF-8 编码的字节内容）"],
+        new_code: Annotated[Union[str, bytes], "修改后的代码（字符串或 UTF-8 编码的字节内容）"],
+        language: Annotated[str, "编程语言类型，目前支持 'lua', 'xml'"],
+        edits: Annotated[Optional[List[Dict[str, Any]]], "从修改前到修改后的编辑列表，格式与 Tree.edit() 的参数一致"] = None
+    ) -> Mapping[str, Any]:
         """
-        检测 Lua 代码语法错误
+        基于修改前代码的语法树增量检测修改后的代码，适用于没有稳定文档标识、但持有修改前后内容的调用方
+        
+        语法树按内容哈希缓存：修改前的代码曾经通过本方法检测过时，只重新解析修改的部分；
+        否则完整解析修改后的代码，并缓存其语法树供下一次修改使用
         
         Args:
-            code: 要检测的 Lua 代码字符串
-            
+            old_code: 修改前的代码
+            new_code: 修改后的代码
+            language: 编程语言类型，目前支持 'lua', 'xml'
+            edits: 从修改前到修改后的编辑列表，为 None 时根据前后内容自动计算
+        
         Returns:
-            包含检测结果的字典
+            检测结果，格式与 check_syntax 相同
         """
-        try:
-            # 检查 Lua 解析器是否可用
-            if not LUA_LANGUAGE_AVAILABLE:
-                return {
-                    "has_errors": True,
-                    "is_valid": False,
-                    "errors": [{
-                        "line": 0,
-                        "column": 0,
-                        "message": "Tree-sitter Lua language is not available. Please install: pip install tree-sitter-lua",
-                        "type": "dependency_error",
-                        "node_type": "missing_lua_parser"
-                    }],
-                    "language": "lua",
-                    "available": False
-                }
+        old_bytes = old_code.encode('utf-8') if isinstance(old_code, str) else old_code
+        new_bytes = new_code.encode('utf-8') if isinstance(new_code, str) else new_code
+        language_name = language.lower()
+        old_doc_id = "blake2b:" + hashlib.blake2b(old_bytes, digest_size=16).hexdigest()
+        new_doc_id = "blake2b:" + hashlib.blake2b(new_bytes, digest_size=16).hexdigest()
+        
+        # 把修改前内容的语法树转移到修改后内容的键下，由 check_syntax 完成编辑和增量解析
+        if old_doc_id != new_doc_id:
+            with SyntaxChecker._cache_lock:
+                cached = SyntaxChecker._tree_cache.pop((language_name, old_doc_id), None)
+                if cached is not None:
+                    SyntaxChecker._tree_cache[(language_name, new_doc_id)] = cached
+        
+        return SyntaxChecker.check_syntax(new_bytes, language, new_doc_id, edits)
+    
+    @staticmethod
+    def check_syntax_batch(
+        items: Annotated[List[Tuple[Any, ...]], "待检测项列表，每项为 (代码, 语言) 或 (代码, 语言, 文档标识)"],
+        max_workers: Annotated[Optional[int], "并行检测的线程数，为 None 时使用 CPU 核心数"] = None
+    ) -> List[Mapping[str, Any]]:
+        """
+        并行检测多段代码的语法错误
+        
+        Tree-sitter 解析期间会释放 GIL，多个文件可以在多个线程中同时解析，每个线程从解析器池中借用各自的解析器
+        
+        Args:
+            items: 待检测项列表，每项的参数与 check_syntax 的 code、language、doc_id 相同
+            max_workers: 并行检测的线程数，为 None 时使用 CPU 核心数
             
-            # 获取 Lua 解析器
-            parser = SyntaxChecker._get_lua_parser()
-            if parser is None:
-                return {
-                    "has_errors": True,
-                    "is_valid": False,
-                    "errors": [{
-                        "line": 0,
-                        "column": 0,
-                        "message": "Failed to initialize Lua parser",
-                        "type": "parser_error",
-                        "node_type": "initialization_error"
-                    }],
-                    "language": "lua",
-                    "available": False
-                }
+        Returns:
+            与 items 顺序一致的检测结果列表，每个结果的格式与 check_syntax 相同
+        """
+        if not items:
+            return []
+        
+        workers = min(len(items), max_workers or os.cpu_count() or 1)
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="syntax-checker-batch") as executor:
+            return list(executor.map(lambda item: SyntaxChecker.check_syntax(*item), items))
+    
+    @staticmethod
+    def _precheck_lua_brackets(code: bytes) -> Optional[Dict[str, Any]]:
+        """
+        Lua 括号配对快速预检
+        
+        只在代码中不含字符串、注释和长括号（这些内容里的括号不参与配对）时生效：
+        先用 bytes.count() 比较各类括号的数量，数量不一致时再定位第一个不匹配的括号。
+        
+        Args:
+            code: UTF-8 编码的 Lua 代码
             
-            # 解析代码
-            code_bytes = code.encode('utf-8')
-            tree = parser.parse(code_bytes)
+        Returns:
+            发现括号不匹配时返回检测结果字典，否则返回 None（需要交给解析器完整检测）
+        """
+        if b'"' in code or b"'" in code or b'--' in code or b'[[' in code or b'[=' in code:
+            return None
+        
+        if (code.count(b'(') == code.count(b')')
+                and code.count(b'{') == code.count(b'}')
+                and code.count(b'[') == code.count(b']')):
+            return None
+        
+        # 数量不一致，定位第一个不匹配的括号
+        pairs = {b')': b'(', b'}': b'{', b']': b'['}
+        stack = []
+        position = None
+        for match in _BRACKET_PATTERN.finditer(code):
+            bracket = match.group()
+            if bracket in pairs:
+                if not stack or stack[-1][0] != pairs[bracket]:
+                    position = match.start()
+                    break
+                stack.pop()
+            else:
+                stack.append((bracket, match.start()))
+        if position is None:
+            if not stack:
+                return None
+            bracket, position = stack[-1]
+        
+        line_start = code.rfind(b'\n', 0, position) + 1
+        line = code.count(b'\n', 0, position) + 1
+        column = position - line_start + 1  # 与 Tree-sitter 报告的错误一致，按字节计算列号
+        return {
+            "has_errors": True,
+            "is_valid": False,
+            "errors": [SyntaxErrorInfo(
+                line=line,
+                column=column,
+                message_template="Unbalanced bracket '{detail}' at line {line}, column {column}",
+                detail=chr(code[position]),
+                type="unbalanced_bracket",
+                node_type="bracket"
+            )],
+            "language": "lua",
+            "available": True
+        }
+    
+    @staticmethod
+    def _unique_errors(errors: List[SyntaxErrorInfo]) -> List[SyntaxErrorInfo]:
+        """
+        去除位置、错误类型和节点类型都相同的重复错误（例如嵌套的错误节点从同一位置开始），保留首次出现的顺序
+        """
+        seen = set()
+        unique = []
+        for error in errors:
+            key = (error.line, error.column, error.type, error.node_type)
+            if key not in seen:
+                seen.add(key)
+                unique.append(error)
+        return unique
+    
+    @staticmethod
+    def _iter_error_nodes(root_node: Any) -> Iterator[Tuple[str, Any]]:
+        """
+        使用 TreeCursor 按文档顺序遍历语法树，只进入包含错误的子树，没有错误的子树整体跳过
+        
+        Args:
+            root_node: 语法树的根节点
+        
+        Yields:
+            ("error", 错误节点) 或 ("missing", 缺失节点)
+        """
+        cursor = root_node.walk()
+        while True:
+            node = cursor.node
+            if node.is_missing:
+                yield "missing", node
+            elif node.is_error:
+                yield "error", node
             
-            # 检查语法错误
-            errors = []
-            has_errors = False
+            if node.has_error and cursor.goto_first_child():
+                continue
+            while not cursor.goto_next_sibling():
+                if not cursor.goto_parent():
+                    return
+    
+    @staticmethod
+    def _collect_lua_errors(root_node: Any, code_bytes: bytes) -> List[SyntaxErrorInfo]:
+        """
+        收集 Lua 语法树中的错误节点和缺失节点
+        
+        Args:
+            root_node: 语法树的根节点
+            code_bytes: UTF-8 编码的 Lua 代码
+        
+        Returns:
+            按文档顺序排列的错误列表（已去除重复项）
+        """
+        errors = []
+        append = errors.append
+        error_text_of = SyntaxChecker._error_text
+        
+        # 只沿包含错误的子树查找错误节点和缺失节点（按文档顺序返回）
+        for capture_name, node in SyntaxChecker._iter_error_nodes(root_node):
+            start_row, start_column = node.start_point
             
-            # 遍历语法树查找错误节点
-            def find_errors(node, code_lines):
-                nonlocal has_errors
-                
-                # 检查是否是错误节点
-                if node.type == "ERROR":
-                    has_errors = True
-                    start_point = node.start_point
-                    end_point = node.end_point
-                    
-                    # 获取错误的文本内容
-                    error_text = ""
-                    if start_point[0] < len(code_lines):
-                        line = code_lines[start_point[0]]
-                        if start_point[1] < len(line):
-                            error_text = line[start_point[1]:end_point[1]] if end_point[0] == start_point[0] else line[start_point[1]:]
-                    
-                    errors.append({
-                        "line": start_point[0] + 1,  # Tree-sitter 行号从0开始，转换为从1开始
-                        "column": start_point[1] + 1,  # Tree-sitter 列号从0开始，转换为从1开始
-                        "message": f"Syntax error at line {start_point[0] + 1}, column {start_point[1] + 1}" + (f": '{error_text}'" if error_text.strip() else ""),
-                        "type": "syntax_error",
-                        "node_type": "ERROR"
-                    })
-                
-                # 检查是否有缺失的节点
-                if node.is_missing:
-                    has_errors = True
-                    start_point = node.start_point
-                    errors.append({
-                        "line": start_point[0] + 1,
-                        "column": start_point[1] + 1,
-                        "message": f"Missing {node.type} at line {start_point[0] + 1}, column {start_point[1] + 1}",
-                        "type": "missing_node",
-                        "node_type": node.type
-                    })
+            # 检查是否是错误节点
+            if capture_name == "error":
+                # 获取错误的文本内容
+                error_text = error_text_of(code_bytes, node)
                 
-                # 检查特定的语法问题
-                if node.type in ["binary_expression", "unary_expression"]:
-                    # 检查二元表达式是否完整
-                    if node.type == "binary_expression" and len(node.children) < 3:
-                        has_errors = True
-                        start_point = node.start_point
-                        errors.append({
-                            "line": start_point[0] + 1,
-                            "column": start_point[1] + 1,
-                            "message": f"Incomplete binary expression at line {start_point[0] + 1}, column {start_point[1] + 1}",
-                            "type": "incomplete_expression",
-                            "node_type": "binary_expression"
-                        })
-                
-                # 递归检查子节点
-                for child in node.children:
-                    find_errors(child, code_lines)
-            
-            # 将代码分割为行，用于错误报告
-            code_lines = code.split('\n')
+                append(SyntaxErrorInfo(
+                    line=start_row + 1,  # Tree-sitter 行号从0开始，转换为从1开始
+                    column=start_column + 1,  # Tree-sitter 列号从0开始，转换为从1开始
+                    message_template="Syntax error at line {line}, column {column}: '{detail}'" if error_text.strip() else "Syntax error at line {line}, column {column}",
+                    detail=error_text,
+                    type="syntax_error",
+                    node_type="ERROR"
+                ))
             
-            # 开始查找错误
-            find_errors(tree.root_node, code_lines)
+            # 检查是否有缺失的节点
+            elif capture_name == "missing":
+                append(SyntaxErrorInfo(
+                    line=start_row + 1,
+                    column=start_column + 1,
+                    message_template="Missing {node_type} at line {line}, column {column}",
+                    type="missing_node",
+                    node_type=node.type
+                ))
+        
+        return SyntaxChecker._unique_errors(errors)
+    
+    @staticmethod
+    def _check_parsed(
+        code_bytes: bytes,
+        language: str,
+        collect_errors: Callable[[Any, bytes], List[SyntaxErrorInfo]],
+        unlocated_message: str,
+        doc_id: Optional[str],
+        edits: Optional[List[Dict[str, Any]]]
+    ) -> Mapping[str, Any]:
+        """
+        解析代码并收集语法错误，Lua 和 XML 共用，语言相关的部分只有错误收集方法和无法定位错误时的描述
+        
+        调用方需先确认对应语言定义可用，并负责处理异常
+        
+        Args:
+            code_bytes: UTF-8 编码的代码
+            language: 语言名称，'lua' 或 'xml'
+            collect_errors: 从语法树根节点收集错误列表的方法
+            unlocated_message: 语法树包含错误但无法定位具体节点时的错误描述
+            doc_id: 文档标识，为 None 时直接完整解析
+            edits: 自上次解析以来的编辑列表，为 None 时根据前后内容自动计算
+        
+        Returns:
+            检测结果
+        """
+        # 解析代码
+        with SyntaxChecker._borrow_parser(language) as parser:
+            tree = SyntaxChecker._parse(parser, code_bytes, language, doc_id, edits)
+        
+        # 语法树中没有错误节点时无需查找
+        root_node = tree.root_node
+        if not root_node.has_error:
+            return _CLEAN_RESULTS[language]
+        
+        # 检查语法错误
+        errors = collect_errors(root_node, code_bytes)
+        
+        # 额外检查：根节点包含错误，但没有找到具体的错误节点
+        if not errors:
+            errors.append(SyntaxErrorInfo(
+                line=1,
+                column=1,
+                message_template=unlocated_message,
+                type="general_syntax_error",
+                node_type="unknown"
+            ))
+        
+        return {
+            "has_errors": True,
+            "is_valid": False,
+            "errors": errors,
+            "language": language,
+            "available": True
+        }
+    
+    @staticmethod
+    def _check_lua_impl(
+        code_bytes: bytes,
+        fast_check: bool,
+        doc_id: Optional[str],
+        edits: Optional[List[Dict[str, Any]]]
+    ) -> Mapping[str, Any]:
+        """
+        检测 Lua 代码语法错误的实现部分
+        
+        调用方需先确认 Lua 语言定义可用，并负责处理异常（check_syntax 直接调用该方法，避免重复检查和嵌套的异常处理）
+        """
+        # 括号明显不匹配时直接返回，无需完整解析
+        if fast_check:
+            precheck_result = SyntaxChecker._precheck_lua_brackets(code_bytes)
+            if precheck_result is not None:
+                SyntaxChecker._discard_tree("lua", doc_id)
+                return precheck_result
+        
+        return SyntaxChecker._check_parsed(
+            code_bytes, "lua", SyntaxChecker._collect_lua_errors,
+            "Code contains syntax errors that could not be precisely located", doc_id, edits
+        )
+    
+    @staticmethod
+    def check_lua_syntax(
+        code: Annotated[Union[str, bytes], "要检测的 Lua 代码（字符串或 UTF-8 编码的字节内容）"],
+        fast_check: Annotated[bool, "是否先进行括号配对快速预检"] = True,
+        doc_id: Annotated[Optional[str], "文档标识（例如文件路径），用于增量解析"] = None,
+        edits: Annotated[Optional[List[Dict[str, Any]]], "自上次检测以来的编辑列表"] = None
+    ) -> Mapping[str, Any]:
+        """
+        检测 Lua 代码语法错误
+        
+        Args:
+            code: 要检测的 Lua 代码，可以是字符串或 UTF-8 编码的字节内容
+            fast_check: 是否先进行括号配对快速预检，括号明显不匹配时跳过完整解析
+            doc_id: 文档标识，提供时复用该文档上次的语法树进行增量解析
+            edits: 自上次检测以来的编辑列表，为 None 时根据前后内容自动计算
             
-            # 额外检查：如果没有发现明显的语法错误，但根节点包含错误子节点
-            if not has_errors and tree.root_node.has_error:
-                has_errors = True
-                errors.append({
-                    "line": 1,
-                    "column": 1,
-                    "message": "Code contains syntax errors that could not be precisely located",
-                    "type": "general_syntax_error",
-                    "node_type": "unknown"
-                })
+        Returns:
+            包含检测结果的只读映射（错误列表为元组），格式与 check_syntax 相同
+        """
+        try:
+            # 检查 Lua 语言包是否已安装且语言定义初始化成功
+            not_ready = _not_ready_result("lua")
+            if not_ready is not None:
+                return not_ready
             
-            return {
-                "has_errors": has_errors,
-                "is_valid": not has_errors,
-                "errors": errors,
-                "language": "lua",
-                "available": True
-            }
+            code_bytes = code.encode('utf-8') if isinstance(code, str) else code
+            if len(code_bytes) > MAX_CODE_BYTES:
+                SyntaxChecker._discard_tree("lua", doc_id)
+                return SyntaxChecker._input_too_large_result(len(code_bytes), "lua")
+            return _frozen_result(SyntaxChecker._check_lua_impl(code_bytes, fast_check, doc_id, edits))
             
         except Exception as e:
             logger.error(f"Error in Lua syntax checking: {e}")
-            return {
+            return _frozen_result({
                 "has_errors": True,
                 "is_valid": False,
-                "errors": [{
-                    "line": 0,
-                    "column": 0,
-                    "message": f"Internal error during Lua syntax checking: {str(e)}",
-                    "type": "internal_error",
-                    "node_type": "exception"
-                }],
+                "errors": [SyntaxErrorInfo(
+                    line=0,
+                    column=0,
+                    message_template="Internal error during Lua syntax checking: {detail}",
+                    detail=str(e),
+                    type="internal_error",
+                    node_type="exception"
+                )],
                 "language": "lua",
                 "available": True
-            }
+            })
+    
+    @staticmethod
+    def _collect_xml_errors(root_node: Any, code_bytes: bytes) -> List[SyntaxErrorInfo]:
+        """
+        收集 XML 语法树中的错误节点和缺失节点
+        
+        未闭合的标签和注释、注释中的 '--' 以及未加引号的属性值都由语法本身报告为错误节点，无需额外检查
+        
+        Args:
+            root_node: 语法树的根节点
+            code_bytes: UTF-8 编码的 XML 代码
+        
+        Returns:
+            按文档顺序排列的错误列表（已去除重复项）
+        """
+        errors = []
+        append = errors.append
+        error_text_of = SyntaxChecker._error_text
+        
+        # 只沿包含错误的子树查找错误节点和缺失节点（按文档顺序返回）
+        for capture_name, node in SyntaxChecker._iter_error_nodes(root_node):
+            # 检查是否是错误节点
+            if capture_name == "error":
+                start_row, start_column = node.start_point
+                
+                # 获取错误的文本内容
+                error_text = error_text_of(code_bytes, node)
+                
+                append(SyntaxErrorInfo(
+                    line=start_row + 1,  # Tree-sitter 行号从0开始，转换为从1开始
+                    column=start_column + 1,  # Tree-sitter 列号从0开始，转换为从1开始
+                    message_template="XML syntax error at line {line}, column {column}: '{detail}'" if error_text.strip() else "XML syntax error at line {line}, column {column}",
+                    detail=error_text,
+                    type="syntax_error",
+                    node_type="ERROR"
+                ))
+            
+            # 检查是否有缺失的节点（错误节点本身不会再按缺失节点重复报告）
+            elif capture_name == "missing":
+                start_row, start_column = node.start_point
+                append(SyntaxErrorInfo(
+                    line=start_row + 1,
+                    column=start_column + 1,
+                    message_template="Missing {node_type} at line {line}, column {column}",
+                    type="missing_node",
+                    node_type=node.type
+                ))
+        
+        return SyntaxChecker._unique_errors(errors)
     
     @staticmethod
-    def check_xml_syntax(code: Annotated[str, "要检测的 XML 代码字符串"]) -> Dict[str, Any]:
+    def _check_xml_impl(
+        code_bytes: bytes,
+        doc_id: Optional[str],
+        edits: Optional[List[Dict[str, Any]]]
+    ) -> Mapping[str, Any]:
+        """
+        检测 XML 代码语法错误的实现部分
+        
+        调用方需先确认 XML 语言定义可用，并负责处理异常（check_syntax 直接调用该方法，避免重复检查和嵌套的异常处理）
+        """
+        return SyntaxChecker._check_parsed(
+            code_bytes, "xml", SyntaxChecker._collect_xml_errors,
+            "XML contains syntax errors that could not be precisely located", doc_id, edits
+        )
+    
+    @staticmethod
+    def check_xml_syntax(
+        code: Annotated[Union[str, bytes], "要检测的 XML 代码（字符串或 UTF-8 编码的字节内容）"],
+        doc_id: Annotated[Optional[str], "文档标识（例如文件路径），用于增量解析"] = None,
+        edits: Annotated[Optional[List[Dict[str, Any]]], "自上次检测以来的编辑列表"] = None
+    ) -> Mapping[str, Any]:
         """
         检测 XML 代码语法错误，正确处理 XML 注释
         
@@ -356,10 +1056,12 @@ class SyntaxChecker:
         - 元素间注释：<root><!-- 注释 --><item/></root>
         
         Args:
-            code: 要检测的 XML 代码字符串
+            code: 要检测的 XML 代码，可以是字符串或 UTF-8 编码的字节内容
+            doc_id: 文档标识，提供时复用该文档上次的语法树进行增量解析
+            edits: 自上次检测以来的编辑列表，为 None 时根据前后内容自动计算
             
         Returns:
-            Dict[str, Any]: 包含检测结果的字典，格式与其他语言检测器一致
+            Mapping[str, Any]: 包含检测结果的只读映射，格式与其他语言检测器一致（错误列表为元组）
             
         Example:
             >>> checker = SyntaxChecker()
@@ -370,207 +1072,33 @@ class SyntaxChecker:
             >>> print(result['has_errors'])  # False (正确的 XML 包含注释)
         """
         try:
-            # 检查 XML 解析器是否可用
-            if not XML_LANGUAGE_AVAILABLE:
-                return {
-                    "has_errors": True,
-                    "is_valid": False,
-                    "errors": [{
-                        "line": 0,
-                        "column": 0,
-                        "message": "Tree-sitter XML language is not available. Please install: pip install tree-sitter-xml",
-                        "type": "dependency_error",
-                        "node_type": "missing_xml_parser"
-                    }],
-                    "language": "xml",
-                    "available": False
-                }
-            
-            # 获取 XML 解析器
-            parser = SyntaxChecker._get_xml_parser()
-            if parser is None:
-                return {
-                    "has_errors": True,
-                    "is_valid": False,
-                    "errors": [{
-                        "line": 0,
-                        "column": 0,
-                        "message": "Failed to initialize XML parser",
-                        "type": "parser_error",
-                        "node_type": "initialization_error"
-                    }],
-                    "language": "xml",
-                    "available": False
-                }
-            
-            # 解析代码
-            code_bytes = code.encode('utf-8')
-            tree = parser.parse(code_bytes)
+            # 检查 XML 语言包是否已安装且语言定义初始化成功
+            not_ready = _not_ready_result("xml")
+            if not_ready is not None:
+                return not_ready
             
-            # 检查语法错误
-            errors = []
-            has_errors = False
-            
-            # 遍历语法树查找错误节点
-            def find_xml_errors(node, code_lines):
-                nonlocal has_errors
-                
-                # 检查是否是错误节点
-                if node.type == "ERROR":
-                    has_errors = True
-                    start_point = node.start_point
-                    end_point = node.end_point
-                    
-                    # 获取错误的文本内容
-                    error_text = ""
-                    if start_point[0] < len(code_lines):
-                        line = code_lines[start_point[0]]
-                        if start_point[1] < len(line):
-                            error_text = line[start_point[1]:end_point[1]] if end_point[0] == start_point[0] else line[start_point[1]:]
-                    
-                    errors.append({
-                        "line": start_point[0] + 1,  # Tree-sitter 行号从0开始，转换为从1开始
-                        "column": start_point[1] + 1,  # Tree-sitter 列号从0开始，转换为从1开始
-                        "message": f"XML syntax error at line {start_point[0] + 1}, column {start_point[1] + 1}" + (f": '{error_text}'" if error_text.strip() else ""),
-                        "type": "syntax_error",
-                        "node_type": "ERROR"
-                    })
-                
-                # 检查是否有缺失的节点
-                if node.is_missing:
-                    has_errors = True
-                    start_point = node.start_point
-                    errors.append({
-                        "line": start_point[0] + 1,
-                        "column": start_point[1] + 1,
-                        "message": f"Missing {node.type} at line {start_point[0] + 1}, column {start_point[1] + 1}",
-                        "type": "missing_node",
-                        "node_type": node.type
-                    })
-                
-                # 检查 XML 特定的语法问题
-                if node.type == "element":
-                    # 检查元素标签是否匹配
-                    start_tag = None
-                    end_tag = None
-                    
-                    for child in node.children:
-                        if child.type == "start_tag":
-                            start_tag = child
-                        elif child.type == "end_tag":
-                            end_tag = child
-                    
-                    # 如果有开始标签但没有结束标签（对于非自闭合标签）
-                    if start_tag and not end_tag:
-                        # 检查是否是自闭合标签
-                        start_tag_text = code_bytes[start_tag.start_byte:start_tag.end_byte].decode('utf-8', errors='ignore')
-                        if not start_tag_text.endswith('/>'):
-                            has_errors = True
-                            start_point = start_tag.start_point
-                            errors.append({
-                                "line": start_point[0] + 1,
-                                "column": start_point[1] + 1,
-                                "message": f"Unclosed tag at line {start_point[0] + 1}, column {start_point[1] + 1}",
-                                "type": "unclosed_tag",
-                                "node_type": "element"
-                            })
-                
-                # 检查注释相关的错误
-                elif node.type == "comment":
-                    # 获取注释内容
-                    comment_text = code_bytes[node.start_byte:node.end_byte].decode('utf-8', errors='ignore')
-                    
-                    # 检查注释是否正确闭合
-                    if not comment_text.startswith('<!--') or not comment_text.endswith('-->'):
-                        has_errors = True
-                        start_point = node.start_point
-                        errors.append({
-                            "line": start_point[0] + 1,
-                            "column": start_point[1] + 1,
-                            "message": f"Malformed comment at line {start_point[0] + 1}, column {start_point[1] + 1}",
-                            "type": "malformed_comment",
-                            "node_type": "comment"
-                        })
-                    
-                    # 检查注释内容中是否包含非法的 '--' 序列
-                    comment_content = comment_text[4:-3]  # 去掉 <!-- 和 -->
-                    if '--' in comment_content:
-                        has_errors = True
-                        start_point = node.start_point
-                        errors.append({
-                            "line": start_point[0] + 1,
-                            "column": start_point[1] + 1,
-                            "message": f"Invalid '--' sequence in comment content at line {start_point[0] + 1}, column {start_point[1] + 1}",
-                            "type": "invalid_comment_content",
-                            "node_type": "comment"
-                        })
-                
-                # 检查属性相关的错误
-                elif node.type == "attribute":
-                    # 检查属性值是否正确引用
-                    attribute_text = code_bytes[node.start_byte:node.end_byte].decode('utf-8', errors='ignore')
-                    
-                    # 简单检查属性值是否有引号
-                    if '=' in attribute_text:
-                        parts = attribute_text.split('=', 1)
-                        if len(parts) == 2:
-                            value_part = parts[1].strip()
-                            if not ((value_part.startswith('"') and value_part.endswith('"')) or 
-                                   (value_part.startswith("'") and value_part.endswith("'"))):
-                                has_errors = True
-                                start_point = node.start_point
-                                errors.append({
-                                    "line": start_point[0] + 1,
-                                    "column": start_point[1] + 1,
-                                    "message": f"Unquoted attribute value at line {start_point[0] + 1}, column {start_point[1] + 1}",
-                                    "type": "unquoted_attribute",
-                                    "node_type": "attribute"
-                                })
-                
-                # 递归检查子节点
-                for child in node.children:
-                    find_xml_errors(child, code_lines)
-            
-            # 将代码分割为行，用于错误报告
-            code_lines = code.split('\n')
-            
-            # 开始查找错误
-            find_xml_errors(tree.root_node, code_lines)
-            
-            # 额外检查：如果没有发现明显的语法错误，但根节点包含错误子节点
-            if not has_errors and tree.root_node.has_error:
-                has_errors = True
-                errors.append({
-                    "line": 1,
-                    "column": 1,
-                    "message": "XML contains syntax errors that could not be precisely located",
-                    "type": "general_syntax_error",
-                    "node_type": "unknown"
-                })
-            
-            return {
-                "has_errors": has_errors,
-                "is_valid": not has_errors,
-                "errors": errors,
-                "language": "xml",
-                "available": True
-            }
+            code_bytes = code.encode('utf-8') if isinstance(code, str) else code
+            if len(code_bytes) > MAX_CODE_BYTES:
+                SyntaxChecker._discard_tree("xml", doc_id)
+                return SyntaxChecker._input_too_large_result(len(code_bytes), "xml")
+            return _frozen_result(SyntaxChecker._check_xml_impl(code_bytes, doc_id, edits))
             
         except Exception as e:
             logger.error(f"Error in XML syntax checking: {e}")
-            return {
+            return _frozen_result({
                 "has_errors": True,
                 "is_valid": False,
-                "errors": [{
-                    "line": 0,
-                    "column": 0,
-                    "message": f"Internal error during XML syntax checking: {str(e)}",
-                    "type": "internal_error",
-                    "node_type": "exception"
-                }],
+                "errors": [SyntaxErrorInfo(
+                    line=0,
+                    column=0,
+                    message_template="Internal error during XML syntax checking: {detail}",
+                    detail=str(e),
+                    type="internal_error",
+                    node_type="exception"
+                )],
                 "language": "xml",
                 "available": True
-            }
+            })
     
     @staticmethod
     def get_supported_languages() -> List[str]:
@@ -580,15 +1108,7 @@ class SyntaxChecker:
         Returns:
             支持的语言列表，包括 'lua' 和 'xml'（如果相应的依赖库可用）
         """
-        supported = []
-        
-        if TREE_SITTER_AVAILABLE and LUA_LANGUAGE_AVAILABLE:
-            supported.append("lua")
-        
-        if TREE_SITTER_AVAILABLE and XML_LANGUAGE_AVAILABLE:
-            supported.append("xml")
-            
-        return supported
+        return list(_SUPPORTED_LANGUAGES)
     
     @staticmethod
     def is_available() -> bool:
@@ -611,8 +1131,4 @@ class SyntaxChecker:
             - tree_sitter_lua: Lua 语言解析器是否可用
             - tree_sitter_xml: XML 语言解析器是否可用
         """
-        return {
-            "tree_sitter": TREE_SITTER_AVAILABLE,
-            "tree_sitter_lua": LUA_LANGUAGE_AVAILABLE,
-            "tree_sitter_xml": XML_LANGUAGE_AVAILABLE
-        }
+        return dict(_DEPENDENCY_STATUS)